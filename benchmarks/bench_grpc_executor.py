@@ -0,0 +1,187 @@
+"""
+Phase benchmark for grpc_executor against a local in-process gRPC stand-in.
+
+    python benchmarks/bench_grpc_executor.py --payload-sizes 64,4096,65536 --output bench_grpc_executor.json
+
+Measures cold start, codegen, warm unary and streaming latency,
+create_protobuff_request / MessageToDict conversion cost and peak
+memory of Grpc and GrpcClient. Results are written as JSON.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from google.protobuf.json_format import MessageToDict
+from grpc_standin import DEFAULT_PROTO, SERVICE_NAME, GrpcStandIn
+
+PROTO_FILE = os.path.basename(DEFAULT_PROTO)
+NUMBERS = list(range(16))
+
+
+def make_payload(port, size, method="UnaryEcho", repeat=1) -> dict:
+    return {
+        "protoPackage": PROTO_FILE,
+        "service": f"{SERVICE_NAME}/{method}",
+        "connect": {"host": "127.0.0.1", "port": port},
+        "input": {"payload": "x" * size, "repeat": repeat, "numbers": NUMBERS},
+    }
+
+
+def summarize(samples) -> dict:
+    """
+    This method returns latency summary in milliseconds.
+    """
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def timed(call, iterations) -> list:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_payload(grpc_executor, client, port, size, args) -> dict:
+    """
+    This method measures warm unary, streaming and conversion cost for one payload size.
+    """
+    client.payload = make_payload(port, size)
+    unary = timed(client.execute_grpc_request, args.iterations)
+
+    input_type, output_type = client._get_input_from_grpc_service(SERVICE_NAME, "UnaryEcho")
+    to_message = timed(lambda: client.create_protobuff_request(input_type), args.iterations)
+    reply = output_type(payload="x" * size, numbers=NUMBERS)
+    to_dict = timed(lambda: MessageToDict(reply), args.iterations)
+
+    # GrpcClient only handles unary calls, stream through its generated stub and channel
+    _, pb2_grpc_module = client.import_grpc_module()
+    stub = getattr(pb2_grpc_module, client.get_stub_property(SERVICE_NAME))(client.define_channel_interface())
+    client.payload = make_payload(port, size, "StreamEcho", args.stream_messages)
+    stream_request = client.create_protobuff_request(input_type)
+
+    def consume_stream():
+        for message in stub.StreamEcho(stream_request):
+            MessageToDict(message)
+
+    stream = timed(consume_stream, args.iterations)
+    return {
+        "payload_bytes": size,
+        "unary_execute": summarize(unary),
+        "create_protobuff_request": summarize(to_message),
+        "message_to_dict": summarize(to_dict),
+        "stream_execute": summarize(stream),
+        "stream_messages": args.stream_messages,
+    }
+
+
+def bench_memory(grpc_executor, port, size, args) -> dict:
+    """
+    This method measures python heap peak of Grpc end to end and of GrpcClient warm requests.
+    """
+    payload_file = os.path.abspath("bench_memory_payload.json")
+    with open(payload_file, 'w') as fw:
+        json.dump(make_payload(port, size), fw)
+    tracemalloc.start()
+    grpc_executor.Grpc(payload_file).grpc_executor()
+    _, grpc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    client = grpc_executor.GrpcClient(**make_payload(port, size))
+    for _ in range(args.iterations):
+        client.execute_grpc_request()
+    _, client_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    client.delete_grpc_interface_modules()
+    return {
+        "payload_bytes": size,
+        "grpc_end_to_end_peak_bytes": grpc_peak,
+        "grpc_client_warm_peak_bytes": client_peak,
+        "process_max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run(args) -> dict:
+    results = dict()
+    with GrpcStandIn(reply_size=args.reply_size) as server:
+        # GrpcModuleGenerator compiles protos relative to the working directory
+        workdir = tempfile.mkdtemp(prefix="bench_grpc_")
+        shutil.copy(DEFAULT_PROTO, workdir)
+        previous_dir = os.getcwd()
+        os.chdir(workdir)
+        # generated interface package is imported relative to the working directory
+        sys.path.insert(0, workdir)
+        try:
+            started = time.perf_counter()
+            import grpc_executor
+            results["import_s"] = round(time.perf_counter() - started, 4)
+
+            started = time.perf_counter()
+            client = grpc_executor.GrpcClient(**make_payload(server.port, args.payload_sizes[0]))
+            results["construct_s"] = round(time.perf_counter() - started, 4)
+            client.execute_grpc_request()
+            results["cold_start_s"] = round(time.perf_counter() - started, 4)
+
+            results["payloads"] = [bench_payload(grpc_executor, client, server.port, size, args)
+                                   for size in args.payload_sizes]
+
+            codegen = []
+            for _ in range(args.codegen_runs):
+                started = time.perf_counter()
+                grpc_executor.GrpcModuleGenerator(PROTO_FILE)
+                codegen.append(time.perf_counter() - started)
+            results["codegen"] = summarize(codegen)
+            client.delete_grpc_interface_modules()
+
+            results["memory"] = bench_memory(grpc_executor, server.port, args.payload_sizes[-1], args)
+            results["server_calls"] = server.calls
+        finally:
+            os.chdir(previous_dir)
+            sys.path.remove(workdir)
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main():
+    """
+    Runs grpc executor benchmark and writes results as JSON.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--payload-sizes', type=lambda value: [int(size) for size in value.split(',')],
+                        default=[64, 4096, 65536], help="comma separated request payload sizes in bytes")
+    parser.add_argument('--reply-size', type=int, default=None, help="reply payload size, echoes request when omitted")
+    parser.add_argument('--iterations', type=int, default=50, help="iterations per warm phase")
+    parser.add_argument('--stream-messages', type=int, default=20, help="messages per streaming call")
+    parser.add_argument('--codegen-runs', type=int, default=3, help="protoc code generation runs")
+    parser.add_argument('--output', type=str, default=None, help="output json file, stdout when omitted")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    results = {"benchmark": "grpc_executor", "parameters": vars(args), "results": run(args)}
+    if output:
+        with open(output, 'w') as fw:
+            json.dump(results, fw, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
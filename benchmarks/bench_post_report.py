@@ -0,0 +1,156 @@
+"""
+Provisioning benchmark for post_report.ReportPortal against the offline stand-in.
+
+    python benchmarks/bench_post_report.py --services 20 --latency 0.005 --output bench_post_report.json
+
+Records wall time, API call count, write call count and connections opened
+for single and bulk provisioning, discovery and reconcile reruns with and
+without a provisioning state file, and
+for uploading executor results to a launch.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_index import NAME_INDEX_CACHE
+from tools.reportportal.src.report_portal_scheduler import get_scheduler
+from tools.reportportal.src.post_report import HttpRequest, ReportPortal
+from tools.reportportal.src.report_portal_trace import RequestTracer
+from tools.reportportal.src.report_portal_results import PASSED, LaunchReporter, ResultUploader
+from report_portal_standin import ReportPortalStandIn
+
+PROJECT = "bench"
+RP_UUID = "bench-uuid"
+
+
+def service_name(index) -> str:
+    return f"service_{index}"
+
+
+def report_portal(server, index, state_file) -> ReportPortal:
+    return ReportPortal(PROJECT, service_name(index) + "_dashboard", RP_UUID, service_name(index),
+                        server.endpoint, state_file)
+
+
+def provision(server, index, state_file) -> None:
+    rp = report_portal(server, index, state_file)
+    if not rp.check_dashboard_exist():
+        rp.create_widget(rp.create_dashboard)
+
+
+def discover(server, index, state_file) -> None:
+    report_portal(server, index, state_file).check_dashboard_exist()
+
+
+def reconcile(server, index, state_file) -> None:
+    report_portal(server, index, state_file).reconcile_dashboard()
+
+
+def upload_results(server, count) -> dict:
+    """
+    This method streams synthetic executor results into a launch and
+    returns how long record() held the caller next to end to end time.
+    """
+    server.reset_stats()
+    started = time.perf_counter()
+    uploader = ResultUploader(LaunchReporter(PROJECT, RP_UUID, server.endpoint), "bench_results").start()
+    record_time = 0.0
+    for index in range(count):
+        now = int(time.time() * 1000)
+        result = {"name": "BenchService/UnaryEcho", "status": PASSED, "start_time": now, "end_time": now,
+                  "latency_ms": 1.0, "request": {"index": index}, "response": {"payload": "x" * 64}}
+        record_started = time.perf_counter()
+        uploader.record(result)
+        record_time += time.perf_counter() - record_started
+    upload_stats = uploader.close()
+    result = {"scenario": "upload_results", "results": count,
+              "wall_time_s": round(time.perf_counter() - started, 4),
+              "record_time_s": round(record_time, 4), "uploader": upload_stats}
+    result.update(server.stats())
+    return result
+
+
+def measure(server, name, step, services, state_file, cold_cache=True) -> dict:
+    """
+    This method runs step for every service and returns timings and call counts.
+    """
+    if cold_cache:
+        NAME_INDEX_CACHE.invalidate()
+    server.reset_stats()
+    started = time.perf_counter()
+    for index in services:
+        step(server, index, state_file)
+    wall_time = time.perf_counter() - started
+    result = {"scenario": name, "services": len(services), "wall_time_s": round(wall_time, 4)}
+    result.update(server.stats())
+    return result
+
+
+def run(args) -> list:
+    results = []
+    with ReportPortalStandIn(latency=args.latency, error_rate=args.error_rate,
+                             name_filter=not args.no_name_filter) as server:
+        if args.rate is not None:
+            get_scheduler(server.endpoint + RP_END_POINT, rate=args.rate, burst=max(1, int(args.rate)))
+        for index in range(args.seed_dashboards):
+            server.state.add(DASHBOARD_END_POINT, {"name": f"SEED {index}", "widgets": []})
+        for index in range(args.services + 1):
+            server.add_launch(service_name(index))
+
+        bulk = list(range(1, args.services + 1))
+        state_dir = tempfile.mkdtemp(prefix="bench_rp_state_")
+        # provisioning records state, the *_no_state scenarios start from an empty state file
+        provisioned = os.path.join(state_dir, "provisioned.json")
+        results.append(measure(server, "single_provision", provision, [0], provisioned))
+        results.append(measure(server, "bulk_provision", provision, bulk, provisioned))
+        results.append(measure(server, "bulk_discovery_no_state", discover, bulk, os.path.join(state_dir, "discover.json")))
+        results.append(measure(server, "bulk_discovery_warm_cache", discover, bulk, os.path.join(state_dir, "discover.json"),
+                               cold_cache=False))
+        results.append(measure(server, "bulk_discovery_state_file", discover, bulk, provisioned))
+        results.append(measure(server, "bulk_reconcile_no_state", reconcile, bulk, os.path.join(state_dir, "reconcile.json")))
+        results.append(measure(server, "bulk_reconcile_state_file", reconcile, bulk, provisioned))
+        if args.results:
+            results.append(upload_results(server, args.results))
+    return results
+
+
+def main():
+    """
+    Runs provisioning benchmark and writes results as JSON.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--services', type=int, default=10, help="services provisioned in bulk run")
+    parser.add_argument('--latency', type=float, default=0.0, help="stand-in latency per request in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--seed-dashboards', type=int, default=200, help="unrelated dashboards on the server")
+    parser.add_argument('--no-name-filter', action='store_true', help="stand-in rejects filter.eq.name")
+    parser.add_argument('--results', type=int, default=1000, help="executor results uploaded to a launch")
+    parser.add_argument('--rate', type=float, default=None, help="client side request rate cap, uncapped by default")
+    parser.add_argument('--trace-output', type=str, default=None, help="chrome trace file of all requests")
+    parser.add_argument('--output', type=str, default=None, help="output json file, stdout when omitted")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    if args.trace_output:
+        HttpRequest.tracer = RequestTracer()
+    # ReportPortal reports progress with print, keep it out of json output
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results = {"benchmark": "post_report", "parameters": vars(args), "results": run(args)}
+    if args.trace_output:
+        HttpRequest.tracer.export_chrome_trace(args.trace_output)
+    if args.output:
+        with open(args.output, 'w') as fw:
+            json.dump(results, fw, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
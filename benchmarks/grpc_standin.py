@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent import futures
+from importlib import import_module
+
+import grpc
+from grpc_tools import protoc
+
+SERVER_PACKAGE = "benchstandin"
+SERVICE_NAME = "BenchService"
+DEFAULT_PROTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "protos", "bench_echo.proto")
+
+
+def generate_server_messages(proto_path, out_dir):
+    """
+    Compiles sample proto under a private package so server side message
+    classes never clash with the modules GrpcClient generates and imports.
+    Wire format is unchanged, so both sides interoperate.
+    """
+    proto_name = "standin_" + os.path.basename(proto_path)
+    with open(proto_path, 'r') as fr:
+        source = fr.read()
+    source = source.replace('syntax = "proto3";', f'syntax = "proto3";\npackage {SERVER_PACKAGE};', 1)
+    with open(os.path.join(out_dir, proto_name), 'w') as fw:
+        fw.write(source)
+    if protoc.main(["protoc", "-I", out_dir, f"--python_out={out_dir}", proto_name]) != 0:
+        raise Exception(f"failed to generate stand-in module for {proto_path}")
+    sys.path.insert(0, out_dir)
+    return import_module(proto_name.split('.')[0] + "_pb2")
+
+
+class GrpcStandIn(object):
+    """
+    Local in-process gRPC server for the sample BenchService.
+    UnaryEcho answers one reply, StreamEcho answers request.repeat replies.
+    reply_size overrides reply payload size, default echoes request payload.
+    """
+
+    def __init__(self, proto_path=DEFAULT_PROTO, reply_size=None, latency=0.0, workers=4) -> None:
+        self.proto_path = proto_path
+        self.reply_size = reply_size
+        self.latency = latency
+        self.workers = workers
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._out_dir = None
+        self.server = None
+        self.port = None
+
+    def _reply(self, request, sequence):
+        payload = request.payload if self.reply_size is None else "x" * self.reply_size
+        return self.pb2.EchoReply(payload=payload, sequence=sequence, numbers=request.numbers)
+
+    def _count(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def unary_echo(self, request, context):
+        self._count()
+        return self._reply(request, 0)
+
+    def stream_echo(self, request, context):
+        self._count()
+        for sequence in range(max(1, request.repeat)):
+            yield self._reply(request, sequence)
+
+    def start(self):
+        self._out_dir = tempfile.mkdtemp(prefix="grpc_standin_")
+        self.pb2 = generate_server_messages(self.proto_path, self._out_dir)
+        handlers = {
+            "UnaryEcho": grpc.unary_unary_rpc_method_handler(
+                self.unary_echo,
+                request_deserializer=self.pb2.EchoRequest.FromString,
+                response_serializer=self.pb2.EchoReply.SerializeToString),
+            "StreamEcho": grpc.unary_stream_rpc_method_handler(
+                self.stream_echo,
+                request_deserializer=self.pb2.EchoRequest.FromString,
+                response_serializer=self.pb2.EchoReply.SerializeToString),
+        }
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=self.workers))
+        self.server.add_generic_rpc_handlers(
+            (grpc.method_handlers_generic_handler(SERVICE_NAME, handlers),))
+        self.port = self.server.add_insecure_port("127.0.0.1:0")
+        self.server.start()
+        return self
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.stop(None)
+        if self._out_dir is not None:
+            shutil.rmtree(self._out_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,258 @@
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_results import ITEM_END_POINT, JSON_REQUEST_PART, LOG_END_POINT
+
+
+class StandInState(object):
+    """
+    In memory objects of the stand-in ReportPortal.
+    """
+
+    def __init__(self) -> None:
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.collections = {
+            DASHBOARD_END_POINT: dict(),
+            FILTER_END_POINT: dict(),
+            LAUNCH_END_POINT: dict(),
+            WIDGET_END_POINT: dict(),
+            ITEM_END_POINT: dict(),
+            LOG_END_POINT: dict(),
+        }
+
+    def add(self, end_point, body) -> dict:
+        with self.lock:
+            obj = dict(body, id=next(self.ids))
+            self.collections[end_point][obj["id"]] = obj
+            return obj
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves dashboard, filter, launch and widget endpoints used by ReportPortal,
+    and launch, item and batched log endpoints used by ResultUploader.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def _reply(self, status, body=None, headers=None) -> None:
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        raw = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/"):
+            return json.loads(raw)
+        message = BytesParser().parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + raw)
+        for part in message.get_payload():
+            if part.get_param("name", header="content-disposition") == JSON_REQUEST_PART:
+                return json.loads(part.get_payload(decode=True))
+        return None
+
+    def _route(self):
+        """
+        This method splits request path into resource parts after project name.
+        """
+        url = urlsplit(self.path)
+        path = url.path.split(RP_END_POINT, 1)[-1].strip('/')
+        parts = path.split('/')[1:]
+        return parts, {key: values[0] for key, values in parse_qs(url.query).items()}
+
+    def _handle(self, method) -> None:
+        server = self.server
+        body = self._body()
+        parts, query = self._route()
+        resource = parts[0] if parts else ""
+        with server.stats_lock:
+            server.api_calls[(method, resource)] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and server.random.random() < server.error_rate:
+            self._reply(server.error_code, {"message": "injected error"},
+                        {"Retry-After": str(server.retry_after)})
+            return
+        collection = server.state.collections.get(resource)
+        if collection is None:
+            self._reply(404, {"message": f"unknown resource {resource}"})
+            return
+        handler = getattr(self, f"_{method.lower()}", None)
+        handler(collection, resource, parts, query, body)
+
+    def _get(self, collection, resource, parts, query, body) -> None:
+        if len(parts) > 1:
+            obj = collection.get(int(parts[1]))
+            if obj is None:
+                self._reply(404, {"message": "not found"})
+            else:
+                self._reply(200, obj)
+            return
+        items = list(collection.values())
+        name = query.get("filter.eq.name")
+        if name is not None:
+            if not self.server.name_filter:
+                self._reply(400, {"message": "filter not supported"})
+                return
+            items = [item for item in items if item["name"] == name]
+        if query.get("page.sort", "").endswith("DESC"):
+            items.reverse()
+        size = int(query.get("page.size", 20))
+        number = int(query.get("page.page", 1))
+        total_pages = max(1, -(-len(items) // size))
+        page = items[(number - 1) * size:number * size]
+        self._reply(200, {
+            "content": [{"id": item["id"], "name": item["name"]} for item in page],
+            "page": {"number": number, "size": size, "totalElements": len(items), "totalPages": total_pages},
+        })
+
+    def _post(self, collection, resource, parts, query, body) -> None:
+        if resource == LOG_END_POINT:
+            # batched logs arrive as list in json_request_part
+            entries = body if isinstance(body, list) else [body]
+            self._reply(201, {"responses": [self.server.state.add(resource, entry)["id"] for entry in entries]})
+            return
+        if resource == DASHBOARD_END_POINT:
+            body["widgets"] = []
+        if resource == WIDGET_END_POINT:
+            body["appliedFilters"] = self._applied_filters(body)
+        obj = self.server.state.add(resource, body)
+        self._reply(201, {"id": obj["id"]})
+
+    def _put(self, collection, resource, parts, query, body) -> None:
+        obj = collection.get(int(parts[1]))
+        if obj is None:
+            self._reply(404, {"message": "not found"})
+            return
+        if resource == DASHBOARD_END_POINT and len(parts) > 2 and parts[2] == WIDGET_ADD_END_POINT:
+            obj["widgets"].append(dict(body["addWidget"]))
+        else:
+            if resource == WIDGET_END_POINT:
+                body["appliedFilters"] = self._applied_filters(body)
+            obj.update(body)
+        self._reply(200, {"message": "updated"})
+
+    def _delete(self, collection, resource, parts, query, body) -> None:
+        obj = collection.get(int(parts[1]))
+        if obj is None:
+            self._reply(404, {"message": "not found"})
+            return
+        if resource == DASHBOARD_END_POINT and len(parts) > 2:
+            obj["widgets"] = [widget for widget in obj["widgets"] if widget["widgetId"] != int(parts[2])]
+        else:
+            del collection[obj["id"]]
+        self._reply(200, {"message": "deleted"})
+
+    def _applied_filters(self, body) -> list:
+        filters = self.server.state.collections[FILTER_END_POINT]
+        return [{"id": filter_id, "name": filters.get(filter_id, {}).get("name")}
+                for filter_id in body.get("filterIds", [])]
+
+    def do_GET(self) -> None:
+        self._handle(GET)
+
+    def do_POST(self) -> None:
+        self._handle(POST)
+
+    def do_PUT(self) -> None:
+        self._handle(PUT)
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+
+class ReportPortalStandIn(object):
+    """
+    Local in-process ReportPortal stand-in with latency and error injection.
+    Usage:
+        with ReportPortalStandIn(latency=0.005) as server:
+            server.add_launch("my_service")
+            ReportPortal(project, dashboard, uuid, "my_service", server.endpoint)
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_code=429, retry_after=0,
+                 name_filter=True, seed=0) -> None:
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = StandInState()
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.random = random.Random(seed)
+        self.httpd.latency = latency
+        self.httpd.error_rate = error_rate
+        self.httpd.error_code = error_code
+        self.httpd.retry_after = retry_after
+        self.httpd.name_filter = name_filter
+        self.reset_stats()
+        self.thread = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def state(self) -> StandInState:
+        return self.httpd.state
+
+    def add_launch(self, name) -> dict:
+        return self.state.add(LAUNCH_END_POINT, {"name": name})
+
+    def set_faults(self, latency=None, error_rate=None) -> None:
+        if latency is not None:
+            self.httpd.latency = latency
+        if error_rate is not None:
+            self.httpd.error_rate = error_rate
+
+    def reset_stats(self) -> None:
+        with self.httpd.stats_lock:
+            self.httpd.api_calls = Counter()
+            self.httpd.connections = 0
+
+    def stats(self) -> dict:
+        with self.httpd.stats_lock:
+            calls = dict(self.httpd.api_calls)
+            return {
+                "api_calls": sum(calls.values()),
+                "write_calls": sum(count for (method, _), count in calls.items() if method != GET),
+                "connections": self.httpd.connections,
+                "calls_by_endpoint": {f"{method} {resource}": count for (method, resource), count in sorted(calls.items())},
+            }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
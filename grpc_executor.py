@@ -6,6 +6,7 @@ from importlib import import_module
 import re
 import json
 import shutil
+import time
 from pathlib import Path
 from google.protobuf.json_format import Parse
 from google.protobuf import symbol_database as _symbol_database
@@ -206,6 +207,7 @@ class GrpcClient(GrpcModuleGenerator):
         self.pb2_module_name = None
         self.pb2_grpc_module_name = None
         self.grpc_sym_db = _symbol_database.Default()
+        self.reporter = None
 
     def execute_grpc_request(self):
         """
@@ -224,17 +226,50 @@ class GrpcClient(GrpcModuleGenerator):
         def execute():
             stub_property = self.get_stub_property(service_name)
             stub = getattr(pdb_grpc_module_name, stub_property)
-            self.return_response = getattr(
-                stub(grpc_channel),
-                method)(self.create_protobuff_request(grpc_input_type))
+            grpc_request = self.create_protobuff_request(grpc_input_type)
+            self.return_response = None
+            start_time = time.time()
+            started = time.perf_counter()
+            try:
+                self.return_response = getattr(
+                    stub(grpc_channel),
+                    method)(grpc_request)
+            except Exception as error:
+                self.report_result(start_time, time.perf_counter() - started, error)
+                raise
+            latency = time.perf_counter() - started
             self.return_response = MessageToDict(self.return_response)
             LOG.debug(f'--- server response {self.return_response} --- ')
+            self.report_result(start_time, latency)
 
         try:
             exec(str(execute()))
         except Exception as error:
             raise Exception(f'{error}')
 
+    def report_result(self, start_time, latency, error=None):
+        """
+        hands execution result over to reporter without waiting on it
+        :param start_time: epoch seconds when rpc was sent
+        :param latency: rpc duration in seconds
+        :param error: exception raised by rpc, if any
+        :return: None
+        """
+        if self.reporter is None:
+            return
+        # loaded already by main() when reporting is on
+        from tools.reportportal.src.report_portal_results import FAILED, PASSED
+        self.reporter.record({
+            "name": f"{self.service_name}/{self.method}",
+            "status": FAILED if error is not None else PASSED,
+            "start_time": int(start_time * 1000),
+            "end_time": int((start_time + latency) * 1000),
+            "latency_ms": latency * 1000,
+            "request": self.payload.get("input"),
+            "response": self.return_response,
+            "error": str(error) if error is not None else None,
+        })
+
     def create_protobuff_request(self, grpc_input_type=None):
         """
         creates protobuff json input to protobuff message
@@ -421,11 +456,12 @@ class GrpcClient(GrpcModuleGenerator):
 
 
 class Grpc():
-    def __init__(self, payload):
+    def __init__(self, payload, reporter=None):
         LOG.debug("--- start grpc execution ---")
         with open(payload, 'r') as fr:
             payload = json.load(fr)
         self.grpcclient = GrpcClient(**payload)
+        self.grpcclient.reporter = reporter
 
     def grpc_executor(self):
         self.grpcclient.execute_grpc_request()
@@ -441,9 +477,34 @@ def main():
     parser.add_argument('--input', '-input', type=str,
                         help="input file name",
                         required=True)
+    parser.add_argument('--rp-endpoint', type=str, default=None,
+                        help="reportportal url, results are uploaded when set")
+    parser.add_argument('--rp-project', type=str, default=None,
+                        help="reportportal project name")
+    parser.add_argument('--rp-uuid', type=str, default=os.getenv("rp_uuid"),
+                        help="reportportal api token")
+    parser.add_argument('--rp-launch', type=str, default="grpc_executor",
+                        help="reportportal launch name")
     args = parser.parse_args()
-    grpc_object = Grpc(args.input)
-    grpc_object.grpc_executor()
+    if args.rp_endpoint is not None and not (args.rp_project and args.rp_uuid):
+        parser.error("--rp-endpoint requires --rp-project and --rp-uuid (or rp_uuid env)")
+    reporter = None
+    if args.rp_endpoint is not None:
+        from tools.reportportal.src.report_portal_results import (
+            LaunchReporter, ResultUploader)
+        reporter = ResultUploader(
+            LaunchReporter(args.rp_project, args.rp_uuid, args.rp_endpoint),
+            args.rp_launch).start()
+    try:
+        grpc_object = Grpc(args.input, reporter)
+        grpc_object.grpc_executor()
+    finally:
+        if reporter is not None:
+            # reporting failures must never replace the executor result
+            try:
+                LOG.debug(f"--- reportportal upload {reporter.close()} ---")
+            except Exception as e:
+                LOG.error(f"--- reportportal upload failed {e} --- ")
 
 
 if __name__ == '__main__':
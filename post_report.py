@@ -1,79 +1,175 @@
 import requests
 import json
+import time
 from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_index import MetadataIndex
+from tools.reportportal.src.report_portal_reconcile import DashboardReconciler
+from tools.reportportal.src.report_portal_scheduler import ReportPortalThrottled, get_scheduler
+from tools.reportportal.src.report_portal_state import ProvisioningState
+from tools.reportportal.src.report_portal_status import NOT_FOUND_RESPONSE_CODE
+from tools.reportportal.src.report_portal_trace import CURRENT_OPERATION, body_size, endpoint_template, traced_operation
 
 class HttpRequest(object):
+
+    # RequestTracer shared by all clients, None keeps tracing off
+    tracer = None
  
-    def __init__(self) -> None: 
+    def __init__(self, rate=None, max_concurrency=None) -> None: 
         self.headers = {
             "Content-Type":"application/json",
             "Authorization":"bearer " + self.rp_uuid 
         }
+        # one scheduler per endpoint, shared by every client of that endpoint;
+        # rate and max_concurrency left None keep its setting (uncapped by default)
+        options = {key: value for key, value in (("rate", rate), ("max_concurrency", max_concurrency))
+                   if value is not None}
+        self.scheduler = get_scheduler(self.base_url, **options)
+
     def send_http_request(self, method:str, **args) -> dict:
         """
-        This method sends http request.
+        This method sends http request through rate limiting scheduler.
+        Requests throttled with 429/503 are retried honoring Retry-After.
         Return: response 
         """
         try:
             args["headers"] = self.headers
+            if "files" in args:
+                # let requests set multipart content type with boundary
+                args["headers"] = {key: value for key, value in self.headers.items() if key != "Content-Type"}
             args["verify"] = False
-            resp = getattr(requests, "request")(method, **args)
+            if self.tracer is None:
+                resp = self.scheduler.submit(lambda: getattr(requests, "request")(method, **args))
+            else:
+                resp = self.send_traced_request(method, **args)
             return resp
+        except ReportPortalThrottled:
+            raise
         except Exception as error:
             raise Exception(error)
 
+    def send_traced_request(self, method:str, **args):
+        """
+        This method sends request through scheduler and records
+        latency, status, bytes and retries of it on tracer.
+        Return: response
+        """
+        attempts = []
+        def send():
+            sent = time.perf_counter()
+            response_ = getattr(requests, "request")(method, **args)
+            attempts.append(time.perf_counter() - sent)
+            return response_
+        started = time.perf_counter()
+        resp = None
+        try:
+            resp = self.scheduler.submit(send)
+            return resp
+        except ReportPortalThrottled as error:
+            resp = error.response
+            raise
+        finally:
+            self.tracer.record(
+                getattr(self, "rp_dashboard_name", self.rp_project_name),
+                CURRENT_OPERATION.get(),
+                method,
+                endpoint_template(args["url"], self.rp_project_name),
+                resp.status_code if resp is not None else None,
+                started,
+                time.perf_counter() - started,
+                sum(attempts),
+                body_size(resp.request.body) if resp is not None else 0,
+                len(resp.content) if resp is not None else 0,
+                max(0, len(attempts) - 1))
+
 class ReportPortal(HttpRequest):
    
-    def __init__(self, portal_project, dashboard, rp_uuid, repo_name, rp_endpoint) -> None:
+    def __init__(self, portal_project, dashboard, rp_uuid, repo_name, rp_endpoint, state_file=None,
+                 rate=None, max_concurrency=None) -> None:
         self.rp_project_name = portal_project 
         self.rp_uuid = rp_uuid
+        self.rp_endpoint = str(rp_endpoint)
         self.base_url = str(rp_endpoint) +  RP_END_POINT
         self.rp_dashboard_name = " ".join([word for word in dashboard.split('_')]).upper()
         self.filter_name = repo_name
-        HttpRequest.__init__(self)
+        self.index = MetadataIndex(self)
+        self.state = ProvisioningState(state_file)
+        self.launch_id = None
+        self.widget_ids = []
+        self.dashboard_snapshot = None
+        HttpRequest.__init__(self, rate, max_concurrency)
     
+    @traced_operation
     def check_dashboard_exist(self) -> bool:
         """
         This method checks for existing dashboard in reportportal
         """
-        request_data = dict()
-        current_page_number = 1
-        totalPages = 1
-        dashboard_exist = False
-        while current_page_number <= totalPages : 
-            request_data["url"] = self.base_url + self.rp_project_name +  '/' + DASHBOARD_END_POINT + PAGE_NUMBER_FILETR + str(current_page_number) + PAGE_SIZE_FILETR
-            response_ = self.send_http_request(GET, **request_data) 
-            if response_.status_code == OKAY_RESPONSE_CODE:
-                dashboard_response = json.loads(response_.content)
-                totalPages = dashboard_response.get("page").get("totalPages")
-                current_page_number = dashboard_response.get("page").get("number") + 1
-                if not any(dasboard['name'] == self.rp_dashboard_name for dasboard in dashboard_response["content"]): 
-                    continue
-                else:
-                    # means dashboard exist
-                    print(f"{self.rp_dashboard_name} exist !!!") 
-                    dashboard_exist = True
-                    
-            else:
-                raise Exception(response_.content)
-        return dashboard_exist 
+        if self.load_provisioning_state():
+            print(f"{self.rp_dashboard_name} exist !!!")
+            return True
+        dashboard_id = self.index.dashboard_id(self.rp_dashboard_name)
+        if dashboard_id is None:
+            return False
+        # means dashboard exist
+        self.dashboard_id = dashboard_id
+        print(f"{self.rp_dashboard_name} exist !!!")
+        return True
 
+    @traced_operation
     def check_service_launch_execution(self):
         """
         This method checks launch execution for component or service.
         """
+        self.launch_id = self.index.launch_id(self.launch_name)
+        return self.launch_id is not None
+
+    @traced_operation
+    def load_provisioning_state(self) -> bool:
+        """
+        This method restores ids recorded by last provisioning and validates
+        them with a single dashboard request. Entry is dropped when server
+        no longer has the dashboard or its widgets.
+        """
+        entry = self.state.get(self.rp_endpoint, self.rp_project_name, self.filter_name)
+        if entry is None:
+            return False
         request_data = dict()
-        request_data["url"] = self.base_url + self.rp_project_name +  '/' + LAUNCH_END_POINT + PAGE_SIZE + SORTING_END_POINT
-        response_ = self.send_http_request(GET, **request_data) 
+        request_data["url"] = self.base_url + self.rp_project_name +  '/' + DASHBOARD_END_POINT + '/' + str(entry["dashboard_id"])
+        response_ = self.send_http_request(GET, **request_data)
         if response_.status_code == OKAY_RESPONSE_CODE:
-            launch_response = json.loads(response_.content)
-            if not any(launch['name'] == self.launch_name for launch in launch_response["content"]): 
-                return False
-            else:
+            dashboard = json.loads(response_.content)
+            placed = {widget["widgetId"] for widget in dashboard.get("widgets", [])}
+            if dashboard.get("name") == self.rp_dashboard_name and set(entry["widget_ids"]) <= placed:
+                self.launch_name = self.filter_name
+                self.launch_id = entry["launch_id"]
+                self.filter_id = entry["filter_id"]
+                self.dashboard_id = entry["dashboard_id"]
+                self.widget_ids = list(entry["widget_ids"])
+                self.dashboard_snapshot = dashboard
+                self.index.remember(LAUNCH_END_POINT, self.launch_name, self.launch_id)
+                self.index.remember(FILTER_END_POINT, self.launch_name, self.filter_id)
+                self.index.remember(DASHBOARD_END_POINT, self.rp_dashboard_name, self.dashboard_id)
                 return True
-        else:
+        elif response_.status_code != NOT_FOUND_RESPONSE_CODE:
             raise Exception(response_.content)
+        print(f"{self.rp_dashboard_name} provisioning state is stale, discovering again !!!")
+        self.state.invalidate(self.rp_endpoint, self.rp_project_name, self.filter_name)
+        self.index.forget(DASHBOARD_END_POINT, self.rp_dashboard_name)
+        return False
 
+    @traced_operation
+    def save_provisioning_state(self) -> None:
+        """
+        This method records ids of successful provisioning for later runs.
+        """
+        self.state.save(
+            self.rp_endpoint, self.rp_project_name, self.filter_name,
+            dashboard_name=self.rp_dashboard_name,
+            launch_id=self.launch_id,
+            filter_id=self.filter_id,
+            dashboard_id=self.dashboard_id,
+            widget_ids=self.widget_ids)
+
+    @traced_operation
     def create_filter_for_service(self) -> None:
         """
         This method creates filter for given component or service 
@@ -92,19 +188,30 @@ class ReportPortal(HttpRequest):
             response_    = self.send_http_request(POST, **request_data) 
             if response_.status_code == CREATED_RESPONSE_CODE:
                 self.filter_id = json.loads(response_.content)["id"]
+                self.index.remember(FILTER_END_POINT, self.launch_name, self.filter_id)
                 print(f"{self.launch_name} filter created successfully !!!")
             else:
                 error = f"{self.launch_name} filter creation failed with reason {response_.content}"
                 raise Exception(error, response_)
+        except ReportPortalThrottled:
+            raise
         except Exception as error:
             raise Exception(error)
         
+    @traced_operation
     def create_dashboard(self) -> None:
         """
         This method creates dashboard for given service.
         """
         if self.create_filter_for_service() == False:
             return False
+        self.post_dashboard()
+
+    @traced_operation
+    def post_dashboard(self) -> None:
+        """
+        This method posts dashboard using already created filter.
+        """
         request_data = dict()
         request_data["url"] = self.base_url + self.rp_project_name +  '/' + DASHBOARD_END_POINT
         try:
@@ -114,13 +221,17 @@ class ReportPortal(HttpRequest):
             response_    = self.send_http_request(POST, **request_data) 
             if response_.status_code == CREATED_RESPONSE_CODE:
                 self.dashboard_id = json.loads(response_.content)["id"] 
+                self.index.remember(DASHBOARD_END_POINT, self.rp_dashboard_name, self.dashboard_id)
                 print(f"{self.rp_dashboard_name} dashboard created successfully !!!")
             else:
                 error = f"{self.rp_dashboard_name} dashboard creation failed with reason {response_.content}"
                 raise Exception(error, response_)
+        except ReportPortalThrottled:
+            raise
         except Exception as error:
             raise Exception(error) 
 
+    @traced_operation
     def add_widget_to_dashboard(self, widgetType, index) -> None:
         """
         This method add widget for dashboard.
@@ -140,13 +251,17 @@ class ReportPortal(HttpRequest):
         try:
             response_    = self.send_http_request(PUT, **request_data)  
             if response_.status_code == OKAY_RESPONSE_CODE:
+                self.widget_ids.append(self.widget_id)
                 print(f"{self.widget_name} added successfully to dashboad {self.rp_dashboard_name}") 
             else:
                 raise Exception (f"{self.widget_name} failed with reason {response_.content}")
+        except ReportPortalThrottled:
+            raise
         except Exception as err:
             raise Exception(err)
 
 
+    @traced_operation
     def create_overall_statistic_widget(self, url, widgetType, index)-> None:
         """
         This method creates overall statistic widget for service
@@ -168,6 +283,7 @@ class ReportPortal(HttpRequest):
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
     
+    @traced_operation
     def create_passing_summary_launch_widget(self, url,widgetType,index)-> None:
         """
         This method creates summary launch widget for service
@@ -189,6 +305,7 @@ class ReportPortal(HttpRequest):
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
 
+    @traced_operation
     def create_passing_rate_per_launch_widget(self, url,widgetType, index)->None:
         """
         This method creates passing per rate launch widget for service
@@ -210,6 +327,7 @@ class ReportPortal(HttpRequest):
             raise Exception(error, response_) 
 
     
+    @traced_operation
     def create_launch_static_and_issue_widget(self, url,widgetType, index)->None:
         """
         This method creates launch and issue widget for service 
@@ -231,6 +349,7 @@ class ReportPortal(HttpRequest):
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
 
+    @traced_operation
     def create_most_failed_test_case_widget(self, url,widgetType, index)->None:
         """
         This method creates most failed testcase widget for service 
@@ -250,6 +369,7 @@ class ReportPortal(HttpRequest):
         else:
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
+    @traced_operation
     def create_failed_test_case_widget(self, url,widgetType, index)->None:
         """
         This method creates failed test case widget for service 
@@ -270,6 +390,7 @@ class ReportPortal(HttpRequest):
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
 
+    @traced_operation
     def create_flaky_test_case_widget(self, url,widgetType, index)->None:
         """
         This method creates flaky test case widget for service
@@ -290,6 +411,7 @@ class ReportPortal(HttpRequest):
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
 
+    @traced_operation
     def create_most_time_consuming_wiget(self, url,widgetType, index)->None:
         """
         This method creates most time consuming widget for service.
@@ -310,6 +432,7 @@ class ReportPortal(HttpRequest):
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
 
+    @traced_operation
     def create_launch_static_widget(self, url,widgetType, index)->None:
         """
         This method creates launch static widget for service.
@@ -331,6 +454,7 @@ class ReportPortal(HttpRequest):
             error = f"{self.widget_name} widget creation failed with reason {response_.content}"
             raise Exception(error, response_) 
 
+    @traced_operation
     def create_non_passed_test_case_widget(self, url, widgetType, index)->None:
         """
         This method creates non passed test case widget for service.
@@ -353,15 +477,11 @@ class ReportPortal(HttpRequest):
             raise Exception(error, response_) 
         
         
-    def create_widget(self, methodTorun)->None:
+    def get_widget_map(self) -> dict:
         """
-        This method invokes create wiget for service.
+        This method returns widget type to create method map for service.
         """
-        if methodTorun() == False:
-            print("Error in creating filter or dashboard !!!")
-            return 
-        url = self.base_url + self.rp_project_name +  '/' + WIDGET_END_POINT
-        widgets = {
+        return {
             NOT_PASSED: self.create_non_passed_test_case_widget,
             LAUNCH_STATIC:self.create_launch_static_widget,
             MOST_TIME_CONSUMING:self.create_most_time_consuming_wiget,
@@ -374,5 +494,38 @@ class ReportPortal(HttpRequest):
             OVERALL_STATISTIC_CHART:self.create_overall_statistic_widget
 
         }
+
+    def get_widget_name(self, widgetType, index) -> str:
+        """
+        This method returns name the create method gives to widget.
+        """
+        if widgetType == LAUNCH_STATIC:
+            return self.rp_dashboard_name + "_" + "9"
+        return self.rp_dashboard_name + "_" + str(index)
+
+    @traced_operation
+    def create_widget(self, methodTorun)->None:
+        """
+        This method invokes create wiget for service.
+        """
+        if methodTorun() == False:
+            print("Error in creating filter or dashboard !!!")
+            return 
+        url = self.base_url + self.rp_project_name +  '/' + WIDGET_END_POINT
+        widgets = self.get_widget_map()
+        self.widget_ids = []
         for index, widget in enumerate(reversed(widgets), start=1):
             widgets[widget](url,widget, index)
+        self.save_provisioning_state()
+
+    @traced_operation
+    def reconcile_dashboard(self):
+        """
+        This method brings existing dashboard, filter and widgets in line
+        with widget map, issuing only the write calls that are needed.
+        """
+        self.load_provisioning_state()
+        changes = DashboardReconciler(self).reconcile()
+        if changes != False:
+            self.save_provisioning_state()
+        return changes
@@ -0,0 +1,197 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_status import BAD_REQUEST_RESPONSE_CODE
+from tools.reportportal.src.report_portal_trace import submit_in_context
+
+NAME_FILTER = "filter.eq.name"
+PAGE_NUMBER_PARAM = "page.page"
+PAGE_SIZE_PARAM = "page.size"
+PAGE_SORT_PARAM = "page.sort"
+LATEST_LAUNCH_SORT = "startTime,DESC"
+INDEX_PAGE_SIZE = 100
+INDEX_TTL_SECONDS = 300
+PREFETCH_WORKERS = 4
+
+
+class NameIndexCache(object):
+    """
+    Thread safe name -> id cache with a time to live.
+    clock is injectable for deterministic tests.
+    """
+
+    def __init__(self, ttl=INDEX_TTL_SECONDS, clock=time.monotonic) -> None:
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = dict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        This method returns cached id for key or None when missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < self.clock():
+                del self._entries[key]
+                return None
+            return value
+
+    def put(self, key, value) -> None:
+        """
+        This method stores id for key.
+        """
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+
+    def invalidate(self, key=None) -> None:
+        """
+        This method drops one key, or every key when key is None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+# shared between ReportPortal instances so a bulk run pays each lookup once
+NAME_INDEX_CACHE = NameIndexCache()
+
+# (base_url, end_point) of servers that rejected or ignored the name filter
+_NAME_FILTER_UNSUPPORTED = set()
+_NAME_FILTER_UNSUPPORTED_LOCK = threading.Lock()
+
+
+class MetadataIndex(object):
+    """
+    Resolves dashboards, filters and launches by name.
+    Uses server side name filter first and falls back to a
+    concurrent page scan only when the server rejects the filter;
+    later lookups on that endpoint go straight to the scan.
+    """
+
+    def __init__(self, client, cache=None, workers=PREFETCH_WORKERS) -> None:
+        self.client = client
+        self.cache = NAME_INDEX_CACHE if cache is None else cache
+        self.workers = workers
+
+    def _cache_key(self, end_point, name) -> tuple:
+        return (self.client.base_url, self.client.rp_project_name, end_point, name)
+
+    def _name_filter_supported(self, end_point) -> bool:
+        with _NAME_FILTER_UNSUPPORTED_LOCK:
+            return (self.client.base_url, end_point) not in _NAME_FILTER_UNSUPPORTED
+
+    def _name_filter_unsupported(self, end_point) -> None:
+        with _NAME_FILTER_UNSUPPORTED_LOCK:
+            _NAME_FILTER_UNSUPPORTED.add((self.client.base_url, end_point))
+
+    def _get_page(self, end_point, params):
+        request_data = dict()
+        request_data["url"] = self.client.base_url + self.client.rp_project_name + '/' + end_point
+        request_data["params"] = params
+        return self.client.send_http_request(GET, **request_data)
+
+    def _scan_page(self, end_point, page_number, extra_params=None):
+        params = {PAGE_NUMBER_PARAM: page_number, PAGE_SIZE_PARAM: INDEX_PAGE_SIZE}
+        if extra_params:
+            params.update(extra_params)
+        response_ = self._get_page(end_point, params)
+        if response_.status_code != OKAY_RESPONSE_CODE:
+            raise Exception(response_.content)
+        return json.loads(response_.content)
+
+    def _find_in_page(self, end_point, name, page, seen):
+        """
+        This method caches entries of a page and returns id matching name.
+        Names repeat, e.g. launches of every run; only the first one met
+        in scan order, the latest when sorted so, is cached and returned.
+        """
+        found = None
+        for item in page.get("content", []):
+            if item["name"] in seen:
+                continue
+            seen.add(item["name"])
+            self.cache.put(self._cache_key(end_point, item["name"]), item["id"])
+            if item["name"] == name:
+                found = item["id"]
+        return found
+
+    def scan(self, end_point, name, extra_params=None):
+        """
+        This method scans all pages for name, prefetching remaining pages
+        concurrently once the total page count is known.
+        Pages are consumed in order so sort given in extra_params holds.
+        """
+        seen = set()
+        first_page = self._scan_page(end_point, 1, extra_params)
+        found = self._find_in_page(end_point, name, first_page, seen)
+        total_pages = first_page.get("page", {}).get("totalPages", 1)
+        if found is not None or total_pages <= 1:
+            return found
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [submit_in_context(executor, self._scan_page, end_point, page_number, extra_params)
+                       for page_number in range(2, total_pages + 1)]
+            for future in futures:
+                found = self._find_in_page(end_point, name, future.result(), seen)
+                if found is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        return found
+
+    def resolve(self, end_point, name, extra_params=None):
+        """
+        This method returns id of object with given name or None.
+        """
+        key = self._cache_key(end_point, name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if not self._name_filter_supported(end_point):
+            return self.scan(end_point, name, extra_params)
+        params = {NAME_FILTER: name, PAGE_SIZE_PARAM: 1}
+        if extra_params:
+            params.update(extra_params)
+        response_ = self._get_page(end_point, params)
+        if response_.status_code == BAD_REQUEST_RESPONSE_CODE:
+            self._name_filter_unsupported(end_point)
+            return self.scan(end_point, name, extra_params)
+        if response_.status_code != OKAY_RESPONSE_CODE:
+            raise Exception(response_.content)
+        content = json.loads(response_.content).get("content", [])
+        if any(item["name"] != name for item in content):
+            # server ignored the name filter
+            self._name_filter_unsupported(end_point)
+            return self.scan(end_point, name, extra_params)
+        if not content:
+            return None
+        self.cache.put(key, content[0]["id"])
+        return content[0]["id"]
+
+    def dashboard_id(self, name):
+        return self.resolve(DASHBOARD_END_POINT, name)
+
+    def filter_id(self, name):
+        return self.resolve(FILTER_END_POINT, name)
+
+    def launch_id(self, name):
+        return self.resolve(LAUNCH_END_POINT, name, {PAGE_SORT_PARAM: LATEST_LAUNCH_SORT})
+
+    def remember(self, end_point, name, object_id) -> None:
+        """
+        This method records id of a freshly created object.
+        """
+        self.cache.put(self._cache_key(end_point, name), object_id)
+
+    def forget(self, end_point, name) -> None:
+        """
+        This method drops cached id, e.g. after the object was deleted.
+        """
+        self.cache.invalidate(self._cache_key(end_point, name))
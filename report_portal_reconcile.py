@@ -0,0 +1,249 @@
+import copy
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_index import PREFETCH_WORKERS
+from tools.reportportal.src.report_portal_status import NOT_FOUND_RESPONSE_CODE
+from tools.reportportal.src.report_portal_trace import submit_in_context, traced_operation
+
+DELETE = "DELETE"
+# payload fields compared with fetched widget, filterIds is compared with appliedFilters
+WIDGET_COMPARED_FIELDS = ("widgetType", "description", "contentParameters")
+
+# widget types whose create method binds launch name instead of filter entry
+LAUNCH_NAME_FILTER_WIDGETS = (
+    PASSING_RATE_PER_LAUNCH,
+    MOST_FAILED_TEST_CASE,
+    FAILED_TEST_CASE_TREND,
+    FLAKY_TEST_CASE,
+    MOST_TIME_CONSUMING,
+)
+
+
+def get_widget_payloads() -> dict:
+    """
+    This method returns widget type to payload template map.
+    """
+    return {
+        NOT_PASSED: NON_PASSED_TEST_CASE_TREND_CHART_PAYLOAD,
+        LAUNCH_STATIC: LAUNCH_STATIC_CHART_PAYLOAD,
+        MOST_TIME_CONSUMING: MOST_TIME_CONSUMING_PAYLOAD,
+        FLAKY_TEST_CASE: FLAKY_TEST_CASE_CHART_PAYLOAD,
+        FAILED_TEST_CASE_TREND: FAILED_TEST_CASE_TREND_CHART_PAYLOAD,
+        MOST_FAILED_TEST_CASE: MOST_FAILED_TEST_CASE_CHART_PAYLOAD,
+        LAUNCH_EXECUTION: LAUNCH_EXECUTION_AND_STATISTIC_CHART_PAYLOAD,
+        PASSING_RATE_PER_LAUNCH: PASSING_PER_RATE_LAUNCH_CHART_PAYLOAD,
+        PASSING_RATE_SUMMARY: PASSING_RATE_SUMMARY_CHART_PAYLOAD,
+        OVERALL_STATISTIC_CHART: OVERALL_STATISTIC_CHART_PAYLOAD,
+    }
+
+
+class DashboardReconciler(object):
+    """
+    Compares current dashboard, filter and widgets of a service with
+    widget map of ReportPortal and applies only the difference.
+    """
+
+    def __init__(self, report_portal) -> None:
+        self.rp = report_portal
+        self.project_url = self.rp.base_url + self.rp.rp_project_name + '/'
+        self.changes = {"created": [], "updated": [], "deleted": []}
+
+    def _get_json(self, url) -> dict:
+        response_ = self.rp.send_http_request(GET, url=url)
+        if response_.status_code != OKAY_RESPONSE_CODE:
+            raise Exception(response_.content)
+        return json.loads(response_.content)
+
+    def _write(self, method, url, payload=None) -> None:
+        request_data = dict()
+        request_data["url"] = url
+        if payload is not None:
+            request_data["data"] = json.dumps(payload)
+        response_ = self.rp.send_http_request(method, **request_data)
+        if response_.status_code not in (OKAY_RESPONSE_CODE, CREATED_RESPONSE_CODE):
+            raise Exception(f"{method} {url} failed with reason {response_.content}", response_)
+
+    def desired_widgets(self) -> dict:
+        """
+        This method returns widget name -> (index, widget type) the way
+        create_widget would lay them out.
+        """
+        desired = dict()
+        for index, widget in enumerate(reversed(self.rp.get_widget_map()), start=1):
+            desired[self.rp.get_widget_name(widget, index)] = (index, widget)
+        return desired
+
+    def widget_payload(self, widgetType, name) -> dict:
+        """
+        This method fills widget payload template without touching the shared template.
+        """
+        payload = copy.deepcopy(get_widget_payloads()[widgetType])
+        payload["name"] = name
+        payload["filterIds"] = [self.rp.filter_id]
+        if widgetType in LAUNCH_NAME_FILTER_WIDGETS:
+            payload["contentParameters"]["widgetOptions"]["launchNameFilter"] = self.rp.launch_name
+        else:
+            payload["filters"][0]["value"] = self.rp.filter_id
+            payload["filters"][0]["name"] = self.rp.launch_name
+        return payload
+
+    @staticmethod
+    def matches(desired, current) -> bool:
+        """
+        This method checks that current holds every value of desired.
+        Keys the server adds on its own and order of scalar lists are ignored.
+        """
+        if isinstance(desired, dict):
+            return isinstance(current, dict) and all(
+                DashboardReconciler.matches(value, current.get(key)) for key, value in desired.items())
+        if isinstance(desired, list) and isinstance(current, list):
+            if all(not isinstance(value, (dict, list)) for value in desired + current):
+                return sorted(desired, key=str) == sorted(current, key=str)
+            return len(desired) == len(current) and all(
+                DashboardReconciler.matches(value, other) for value, other in zip(desired, current))
+        return desired == current
+
+    def widget_is_current(self, widgetType, widget) -> bool:
+        """
+        This method checks existing widget against payload create_widget would send:
+        widget type, content fields and options, and filter it is bound to.
+        """
+        payload = self.widget_payload(widgetType, widget.get("name"))
+        filter_ids = [applied["id"] for applied in widget.get("appliedFilters", [])]
+        if filter_ids != payload["filterIds"]:
+            return False
+        return all(self.matches(payload[field], widget.get(field))
+                   for field in WIDGET_COMPARED_FIELDS if field in payload)
+
+    def is_managed_widget(self, name) -> bool:
+        """
+        This method tells widgets named <dashboard>_<index> by this tool
+        apart from widgets users added to the dashboard by hand.
+        """
+        return re.fullmatch(re.escape(self.rp.rp_dashboard_name) + r"_\d+", name) is not None
+
+    @traced_operation
+    def reconcile_filter(self) -> None:
+        """
+        This method reuses filter of service, creating or updating it when needed.
+        """
+        filter_id = self.rp.index.filter_id(self.rp.launch_name)
+        if filter_id is None:
+            self.rp.create_filter_for_service()
+            self.changes["created"].append(self.rp.launch_name)
+            return
+        self.rp.filter_id = filter_id
+        response_ = self.rp.send_http_request(GET, url=self.project_url + FILTER_END_POINT + '/' + str(filter_id))
+        if response_.status_code == NOT_FOUND_RESPONSE_CODE:
+            # filter known from cache or state file was deleted meanwhile
+            self.rp.index.forget(FILTER_END_POINT, self.rp.launch_name)
+            self.rp.create_filter_for_service()
+            self.changes["created"].append(self.rp.launch_name)
+            return
+        if response_.status_code != OKAY_RESPONSE_CODE:
+            raise Exception(response_.content)
+        current = json.loads(response_.content)
+        conditions = current.get("conditions") or [{}]
+        if conditions[0].get("value") != self.rp.launch_name:
+            payload = copy.deepcopy(FILTER_PAYLOAD)
+            payload["conditions"][0]["value"] = self.rp.launch_name
+            payload["name"] = self.rp.launch_name
+            self._write(PUT, self.project_url + FILTER_END_POINT + '/' + str(filter_id), payload)
+            self.changes["updated"].append(self.rp.launch_name)
+            print(f"{self.rp.launch_name} filter updated successfully !!!")
+
+    @traced_operation
+    def reconcile_dashboard(self) -> list:
+        """
+        This method reuses dashboard of service and returns widgets placed on it.
+        """
+        dashboard_id = self.rp.index.dashboard_id(self.rp.rp_dashboard_name)
+        if dashboard_id is None:
+            self.rp.post_dashboard()
+            self.changes["created"].append(self.rp.rp_dashboard_name)
+            return []
+        self.rp.dashboard_id = dashboard_id
+        current = self.rp.dashboard_snapshot
+        if current is None or current.get("id") != dashboard_id:
+            response_ = self.rp.send_http_request(GET, url=self.project_url + DASHBOARD_END_POINT + '/' + str(dashboard_id))
+            if response_.status_code == NOT_FOUND_RESPONSE_CODE:
+                # dashboard known from cache or state file was deleted meanwhile
+                self.rp.index.forget(DASHBOARD_END_POINT, self.rp.rp_dashboard_name)
+                self.rp.post_dashboard()
+                self.changes["created"].append(self.rp.rp_dashboard_name)
+                return []
+            if response_.status_code != OKAY_RESPONSE_CODE:
+                raise Exception(response_.content)
+            current = json.loads(response_.content)
+        return current.get("widgets", [])
+
+    @traced_operation
+    def fetch_widgets(self, widget_ids) -> dict:
+        """
+        This method reads widget details concurrently.
+        """
+        if not widget_ids:
+            return dict()
+        url = self.project_url + WIDGET_END_POINT + '/'
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            futures = [submit_in_context(executor, self._get_json, url + str(widget_id)) for widget_id in widget_ids]
+            return {widget_id: future.result() for widget_id, future in zip(widget_ids, futures)}
+
+    @traced_operation
+    def update_widget(self, widget_id, widgetType, name) -> None:
+        self._write(PUT, self.project_url + WIDGET_END_POINT + '/' + str(widget_id), self.widget_payload(widgetType, name))
+        self.changes["updated"].append(name)
+        print(f"{name} widget updated successfully !!!")
+
+    @traced_operation
+    def remove_widget(self, widget) -> None:
+        url = self.project_url + DASHBOARD_END_POINT + '/' + str(self.rp.dashboard_id) + '/' + str(widget["widgetId"])
+        self._write(DELETE, url)
+        self.changes["deleted"].append(widget["widgetName"])
+        print(f"{widget['widgetName']} removed from dashboard {self.rp.rp_dashboard_name}")
+
+    @traced_operation
+    def reconcile(self):
+        """
+        This method reconciles filter, dashboard and widgets of service.
+        Returns dict of created, updated and deleted object names,
+        or False when service has no launch execution.
+        """
+        self.rp.launch_name = self.rp.filter_name
+        if self.rp.check_service_launch_execution() == False:
+            print(f"{self.rp.launch_name} does not exist in launch execution in RP !!! ")
+            return False
+        self.reconcile_filter()
+        placed = self.reconcile_dashboard()
+        self.rp.widget_ids = []
+        desired = self.desired_widgets()
+
+        existing = dict()
+        for widget in placed:
+            name = widget.get("widgetName", "")
+            if name not in desired:
+                if self.is_managed_widget(name):
+                    self.remove_widget(widget)
+                continue
+            if widget.get("widgetType") != desired[name][1] or name in existing:
+                # wrong type or duplicate left behind by an earlier rerun
+                self.remove_widget(widget)
+                continue
+            existing[name] = widget
+        details = self.fetch_widgets([widget["widgetId"] for widget in existing.values()])
+
+        widget_map = self.rp.get_widget_map()
+        url = self.project_url + WIDGET_END_POINT
+        for name, (index, widgetType) in desired.items():
+            if name not in existing:
+                widget_map[widgetType](url, widgetType, index)
+                self.changes["created"].append(name)
+                continue
+            widget_id = existing[name]["widgetId"]
+            if not self.widget_is_current(widgetType, details[widget_id]):
+                self.update_widget(widget_id, widgetType, name)
+        # widgets created above were appended by add_widget_to_dashboard
+        self.rp.widget_ids.extend(widget["widgetId"] for widget in existing.values())
+        return self.changes
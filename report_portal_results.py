@@ -0,0 +1,268 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.post_report import HttpRequest
+from tools.reportportal.src.report_portal_trace import traced_operation
+
+ITEM_END_POINT = "item"
+LOG_END_POINT = "log"
+FINISH_END_POINT = "finish"
+JSON_REQUEST_PART = "json_request_part"
+RESULT_BUFFER_SIZE = 10000
+LOG_BATCH_SIZE = 100
+FLUSH_INTERVAL_SECONDS = 1.0
+ITEM_WORKERS = 4
+SNIPPET_LENGTH = 1024
+PASSED = "PASSED"
+FAILED = "FAILED"
+
+
+def epoch_millis() -> int:
+    return int(time.time() * 1000)
+
+
+def snippet(value, length=SNIPPET_LENGTH) -> str:
+    """
+    This method renders request or response as json text cut to length.
+    """
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    if len(text) <= length:
+        return text
+    return text[:length] + f"... ({len(text) - length} more characters)"
+
+
+class LaunchReporter(HttpRequest):
+    """
+    Thin ReportPortal client for launches, test items and batched logs.
+    """
+
+    def __init__(self, portal_project, rp_uuid, rp_endpoint, rate=None, max_concurrency=None) -> None:
+        self.rp_project_name = portal_project
+        self.rp_uuid = rp_uuid
+        self.base_url = str(rp_endpoint) + RP_END_POINT
+        self.project_url = self.base_url + self.rp_project_name + '/'
+        self.launch_id = None
+        HttpRequest.__init__(self, rate, max_concurrency)
+
+    def _send(self, method, url, expected, **request_data) -> dict:
+        response_ = self.send_http_request(method, url=url, **request_data)
+        if response_.status_code not in expected:
+            raise Exception(f"{method} {url} failed with reason {response_.content}", response_)
+        return json.loads(response_.content or b"{}")
+
+    @traced_operation
+    def start_launch(self, name, description="") -> str:
+        """
+        This method starts launch and returns its id.
+        """
+        payload = {"name": name, "description": description, "startTime": epoch_millis(), "mode": "DEFAULT"}
+        response = self._send(POST, self.project_url + LAUNCH_END_POINT,
+                              (OKAY_RESPONSE_CODE, CREATED_RESPONSE_CODE), data=json.dumps(payload))
+        self.launch_id = response["id"]
+        print(f"{name} launch started successfully !!!")
+        return self.launch_id
+
+    @traced_operation
+    def finish_launch(self) -> None:
+        url = self.project_url + LAUNCH_END_POINT + '/' + str(self.launch_id) + '/' + FINISH_END_POINT
+        self._send(PUT, url, (OKAY_RESPONSE_CODE,), data=json.dumps({"endTime": epoch_millis()}))
+
+    @traced_operation
+    def report_item(self, name, status, start_time, end_time, description="") -> str:
+        """
+        This method starts and finishes one step item and returns its id.
+        """
+        payload = {"name": name, "description": description, "startTime": start_time,
+                   "type": "STEP", "launchUuid": self.launch_id}
+        response = self._send(POST, self.project_url + ITEM_END_POINT,
+                              (OKAY_RESPONSE_CODE, CREATED_RESPONSE_CODE), data=json.dumps(payload))
+        item_id = response["id"]
+        payload = {"endTime": end_time, "status": status, "launchUuid": self.launch_id}
+        self._send(PUT, self.project_url + ITEM_END_POINT + '/' + str(item_id),
+                   (OKAY_RESPONSE_CODE,), data=json.dumps(payload))
+        return item_id
+
+    @traced_operation
+    def send_logs(self, entries) -> None:
+        """
+        This method posts many log entries in one multipart request.
+        """
+        files = [(JSON_REQUEST_PART, (None, json.dumps(entries), "application/json"))]
+        self._send(POST, self.project_url + LOG_END_POINT,
+                   (OKAY_RESPONSE_CODE, CREATED_RESPONSE_CODE), files=files)
+
+
+class ResultUploader(object):
+    """
+    Streams executor results into a ReportPortal launch from a background thread.
+    record() only enqueues into a bounded buffer so the executor is never
+    held up by ReportPortal; when buffer is full the result is dropped and counted.
+    Launch is started on the uploader thread and reporting errors are only
+    logged and counted, they never reach the executor.
+    Each result becomes a step item, and its log lines are sent in multipart batches.
+
+    Result keys: name, status, start_time, end_time (epoch millis),
+    latency_ms, request, response, error.
+    """
+
+    _STOP = object()
+
+    def __init__(self, reporter, launch_name, buffer_size=RESULT_BUFFER_SIZE,
+                 batch_size=LOG_BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 workers=ITEM_WORKERS) -> None:
+        self.reporter = reporter
+        self.launch_name = launch_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.workers = workers
+        self.buffer = queue.Queue(maxsize=buffer_size)
+        self.thread = None
+        self.recorded = 0
+        self.dropped = 0
+        self.uploaded = 0
+        self.failed = 0
+        self.log_batches = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="rp-result-uploader", daemon=True)
+        self.thread.start()
+        return self
+
+    def record(self, result) -> bool:
+        """
+        This method buffers one result without blocking.
+        Return: False when buffer is full and result was dropped
+        """
+        try:
+            self.buffer.put_nowait(result)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.recorded += 1
+        return True
+
+    def _next_batch(self):
+        """
+        This method waits for first result, then drains up to batch size.
+        Return: batch, True when uploader was asked to stop
+        """
+        batch = []
+        try:
+            result = self.buffer.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, False
+        while result is not self._STOP:
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                result = self.buffer.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _start_launch(self) -> bool:
+        try:
+            self.reporter.start_launch(self.launch_name)
+        except Exception as error:
+            print(f"{self.launch_name} launch could not be started with reason {error}")
+            return False
+        return True
+
+    def _run(self) -> None:
+        started = self._start_launch()
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if not batch:
+                continue
+            if not started:
+                # keep draining so record() never finds buffer full because of a dead launch
+                self.failed += len(batch)
+                continue
+            try:
+                self._upload(batch)
+            except Exception as error:
+                self.failed += len(batch)
+                print(f"upload of {len(batch)} results to {self.launch_name} failed with reason {error}")
+
+    def _report_item(self, result):
+        """
+        This method reports one result as step item.
+        Return: item id, None when ReportPortal refused it
+        """
+        try:
+            return self.reporter.report_item(result["name"], result["status"],
+                                             result["start_time"], result["end_time"],
+                                             f"latency {result.get('latency_ms', 0):.3f} ms")
+        except Exception as error:
+            print(f"{result['name']} result could not be reported to {self.launch_name} with reason {error}")
+            return None
+
+    def _log_entries(self, item_id, result) -> list:
+        base = {"itemUuid": item_id, "launchUuid": self.reporter.launch_id, "time": result["end_time"]}
+        entries = [dict(base, level="INFO", message="request: " + snippet(result.get("request")))]
+        if result.get("response") is not None:
+            entries.append(dict(base, level="INFO", message="response: " + snippet(result["response"])))
+        if result.get("error"):
+            entries.append(dict(base, level="ERROR", message="error: " + snippet(result["error"])))
+        return entries
+
+    def _upload(self, batch) -> None:
+        """
+        This method uploads a batch, counting as failed only results whose
+        item or log batch was refused; the rest of the batch still goes through.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            item_ids = list(executor.map(self._report_item, batch))
+        failed = {position for position, item_id in enumerate(item_ids) if item_id is None}
+        entries = []
+        owners = []
+        for position, (item_id, result) in enumerate(zip(item_ids, batch)):
+            if item_id is None:
+                continue
+            for entry in self._log_entries(item_id, result):
+                entries.append(entry)
+                owners.append(position)
+        for start in range(0, len(entries), self.batch_size):
+            try:
+                self.reporter.send_logs(entries[start:start + self.batch_size])
+            except Exception as error:
+                failed.update(owners[start:start + self.batch_size])
+                print(f"logs of {len(set(owners[start:start + self.batch_size]))} results to "
+                      f"{self.launch_name} failed with reason {error}")
+                continue
+            self.log_batches += 1
+        self.failed += len(failed)
+        self.uploaded += len(batch) - len(failed)
+
+    def close(self) -> dict:
+        """
+        This method drains buffer, finishes launch and returns upload statistics.
+        """
+        if self.thread is None:
+            return self.stats()
+        self.buffer.put(self._STOP)
+        self.thread.join()
+        if self.reporter.launch_id is None:
+            return self.stats()
+        try:
+            self.reporter.finish_launch()
+        except Exception as error:
+            print(f"{self.launch_name} launch could not be finished with reason {error}")
+        else:
+            print(f"{self.launch_name} launch finished with {self.uploaded} results !!!")
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "uploaded": self.uploaded,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "queue_depth": self.buffer.qsize(),
+            "log_batches": self.log_batches,
+        }
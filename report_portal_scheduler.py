@@ -0,0 +1,330 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from tools.reportportal.src.report_portal_status import THROTTLE_RESPONSE_CODES
+
+# None leaves rate and concurrency uncapped until the server throttles
+DEFAULT_RATE = None
+DEFAULT_BURST = 20
+DEFAULT_MAX_CONCURRENCY = None
+MIN_RATE = 0.5
+# sends within this window give request rate observed when an uncapped client is throttled
+RATE_WINDOW_SECONDS = 1.0
+MAX_RETRIES = 5
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 60.0
+# throttles within this window, or the backoff of last cut if longer, count as one episode
+MIN_CUT_WINDOW_SECONDS = 1.0
+# after a cut, every interval restores one concurrency slot and a step of pre-cut rate
+RECOVERY_INTERVAL_SECONDS = 1.0
+RECOVERY_RATE_STEP = 0.1
+SCHEDULER_OPTIONS = ("rate", "burst", "max_concurrency", "max_retries")
+
+
+class ReportPortalThrottled(Exception):
+    """
+    Raised when ReportPortal keeps throttling after all retries.
+    """
+
+    def __init__(self, message, response=None) -> None:
+        super().__init__(message)
+        self.response = response
+
+
+def parse_retry_after(value):
+    """
+    This method converts Retry-After header, seconds or http date, to seconds.
+    Returns None when header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket(object):
+    """
+    Token bucket shared by all threads sending through one scheduler.
+    Rate None lets every sender through, only pause() holds them back.
+    clock and sleep are injectable for deterministic tests.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, clock=time.monotonic, sleep=time.sleep) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    def _refill(self, now) -> None:
+        # no tokens accrue while paused
+        start = max(self._updated, self._paused_until)
+        if self.rate is not None and now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+        self._updated = max(self._updated, now)
+
+    def _take(self, now) -> None:
+        self._sent.append(now)
+        while self._sent and self._sent[0] <= now - RATE_WINDOW_SECONDS:
+            self._sent.popleft()
+
+    def acquire(self) -> float:
+        """
+        This method blocks until a token is available and returns seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now >= self._paused_until and (self.rate is None or self._tokens >= 1):
+                    if self.rate is not None:
+                        self._tokens -= 1
+                    self._take(now)
+                    return waited
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+    def observed_rate(self) -> float:
+        """
+        This method returns requests per second let through over last RATE_WINDOW_SECONDS.
+        """
+        with self._lock:
+            now = self.clock()
+            while self._sent and self._sent[0] <= now - RATE_WINDOW_SECONDS:
+                self._sent.popleft()
+            return len(self._sent) / RATE_WINDOW_SECONDS
+
+    def set_rate(self, rate) -> None:
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = rate
+
+    def pause(self, seconds) -> None:
+        """
+        This method holds back every sender for given seconds.
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+
+    def paused(self) -> bool:
+        with self._lock:
+            return self.clock() < self._paused_until
+
+
+class RequestScheduler(object):
+    """
+    Client side scheduler for ReportPortal calls.
+    Rate and in-flight requests are uncapped by default (or capped at given
+    rate and max_concurrency) until the server answers 429/503. Both are then
+    halved once per throttle episode, i.e. answers arriving within one backoff
+    window of the last cut count once, starting from the rate and concurrency
+    observed when uncapped. Every RECOVERY_INTERVAL_SECONDS they are restored
+    additively until they reach the pre-cut level, after which an uncapped
+    scheduler is uncapped again.
+    Throttled requests are retried after Retry-After or exponential backoff.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, max_retries=MAX_RETRIES,
+                 clock=time.monotonic, sleep=time.sleep) -> None:
+        self.max_rate = rate
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.clock = clock
+        self.bucket = TokenBucket(rate, burst, clock, sleep)
+        self.concurrency_limit = max_concurrency
+        self._in_flight = 0
+        self._waiting = 0
+        self._cut_until = None
+        self._last_recovery = None
+        self._ceiling_rate = None
+        self._ceiling_concurrency = None
+        self._condition = threading.Condition()
+        self.requests = 0
+        self.throttled = 0
+        self.cuts = 0
+        self.retries = 0
+        self.throttle_wait_seconds = 0.0
+        self.rate_wait_seconds = 0.0
+
+    def configure(self, **options) -> None:
+        """
+        This method applies rate, burst, max_concurrency or max_retries
+        to a running scheduler. When a value changes, limits learnt from
+        earlier throttles are dropped.
+        """
+        unknown = set(options) - set(SCHEDULER_OPTIONS)
+        if unknown:
+            raise TypeError(f"unknown scheduler options {sorted(unknown)}")
+        with self._condition:
+            current = {"rate": self.max_rate, "burst": self.bucket.burst,
+                       "max_concurrency": self.max_concurrency, "max_retries": self.max_retries}
+            if all(current[key] == value for key, value in options.items()):
+                return
+            if "max_retries" in options:
+                self.max_retries = options["max_retries"]
+            if "burst" in options:
+                self.bucket.burst = options["burst"]
+            if "rate" in options:
+                self.max_rate = options["rate"]
+            if "max_concurrency" in options:
+                self.max_concurrency = options["max_concurrency"]
+            self.concurrency_limit = self.max_concurrency
+            self.bucket.set_rate(self.max_rate)
+            self._cut_until = None
+            self._last_recovery = None
+            self._condition.notify_all()
+
+    def _enter(self) -> None:
+        with self._condition:
+            self._waiting += 1
+            while self.concurrency_limit is not None and self._in_flight >= self.concurrency_limit:
+                self._condition.wait()
+            self._waiting -= 1
+            self._in_flight += 1
+
+    def _leave(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def _recover(self) -> None:
+        """
+        This method restores limits additively for every recovery interval
+        passed since last cut or last recovery step.
+        """
+        with self._condition:
+            if self._last_recovery is None:
+                return
+            now = self.clock()
+            steps = int((now - self._last_recovery) // RECOVERY_INTERVAL_SECONDS)
+            if steps <= 0:
+                return
+            self._last_recovery += steps * RECOVERY_INTERVAL_SECONDS
+            self.concurrency_limit = min(self._ceiling_concurrency, self.concurrency_limit + steps)
+            rate = min(self._ceiling_rate, self.bucket.rate + steps * RECOVERY_RATE_STEP * self._ceiling_rate)
+            if self.concurrency_limit >= self._ceiling_concurrency and rate >= self._ceiling_rate:
+                # back at pre-cut level, configured caps apply again (None is uncapped)
+                self._last_recovery = None
+                self.concurrency_limit = self.max_concurrency
+                rate = self.max_rate
+            self.bucket.set_rate(rate)
+            self._condition.notify_all()
+
+    def _on_throttle(self, response_, attempt) -> float:
+        delay = parse_retry_after(response_.headers.get("Retry-After"))
+        if delay is None:
+            delay = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempt)
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        with self._condition:
+            self.throttled += 1
+            self.throttle_wait_seconds += delay
+            now = self.clock()
+            in_episode = self.bucket.paused() or (self._cut_until is not None and now < self._cut_until)
+            if not in_episode:
+                # first throttle of an episode, answers to requests sent before the cut are not cut again
+                rate = self.bucket.rate
+                if rate is None:
+                    rate = max(MIN_RATE, self.bucket.observed_rate())
+                concurrency = self.concurrency_limit
+                if concurrency is None:
+                    # throttled request already left, count it back in
+                    concurrency = self._in_flight + 1
+                if self._last_recovery is None:
+                    self._ceiling_rate = rate
+                    self._ceiling_concurrency = concurrency
+                self.cuts += 1
+                self._cut_until = now + max(delay, MIN_CUT_WINDOW_SECONDS)
+                self._last_recovery = self._cut_until
+                self.concurrency_limit = max(1, concurrency // 2)
+                self.bucket.set_rate(max(MIN_RATE, rate / 2))
+        self.bucket.pause(delay)
+        return delay
+
+    def submit(self, send):
+        """
+        This method runs send, a callable returning http response, under
+        rate and concurrency limits, retrying while server throttles.
+        Return: response
+        """
+        attempt = 0
+        while True:
+            self._enter()
+            try:
+                waited = self.bucket.acquire()
+                with self._condition:
+                    self.requests += 1
+                    self.rate_wait_seconds += waited
+                response_ = send()
+            finally:
+                self._leave()
+            if response_.status_code not in THROTTLE_RESPONSE_CODES:
+                self._recover()
+                return response_
+            self._on_throttle(response_, attempt)
+            if attempt >= self.max_retries:
+                raise ReportPortalThrottled(
+                    f"request throttled with {response_.status_code} after {attempt + 1} attempts",
+                    response_)
+            attempt += 1
+            with self._condition:
+                self.retries += 1
+
+    def stats(self) -> dict:
+        """
+        This method returns queue depth and throttle statistics.
+        """
+        with self._condition:
+            return {
+                "queue_depth": self._waiting,
+                "in_flight": self._in_flight,
+                "concurrency_limit": self.concurrency_limit,
+                "rate": self.bucket.rate,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "cuts": self.cuts,
+                "retries": self.retries,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+                "rate_wait_seconds": round(self.rate_wait_seconds, 3),
+            }
+
+
+_SCHEDULERS = dict()
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def get_scheduler(endpoint, **options) -> RequestScheduler:
+    """
+    This method returns scheduler shared by every client of an endpoint,
+    so parallel provisioning of many services respects one server limit.
+    Options given for an endpoint that already has a scheduler reconfigure it.
+    """
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(endpoint)
+        if scheduler is None:
+            scheduler = RequestScheduler(**options)
+            _SCHEDULERS[endpoint] = scheduler
+        elif options:
+            scheduler.configure(**options)
+        return scheduler
@@ -0,0 +1,111 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_STATE_FILE = ".reportportal_state.json"
+STATE_VERSION = 1
+
+# one lock per state file, shared by every ProvisioningState of the process
+_FILE_LOCKS = dict()
+_FILE_LOCKS_LOCK = threading.Lock()
+
+
+def _file_lock(path) -> threading.Lock:
+    with _FILE_LOCKS_LOCK:
+        return _FILE_LOCKS.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextlib.contextmanager
+def _os_lock(path):
+    """
+    This method holds an exclusive OS lock on path.lock, so read-modify-write
+    of the state file is serialized across processes too.
+    """
+    with open(path + ".lock", 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ProvisioningState(object):
+    """
+    On disk record of what was provisioned per endpoint, project and repo:
+    launch_id, filter_id, dashboard_id and widget_ids.
+    Path defaults to rp_state_file environment variable or DEFAULT_STATE_FILE.
+    """
+
+    def __init__(self, path=None) -> None:
+        self.path = path or os.getenv("rp_state_file", DEFAULT_STATE_FILE)
+        self._lock = _file_lock(self.path)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._lock, _os_lock(self.path):
+            yield
+
+    @staticmethod
+    def _key(endpoint, project, repo) -> str:
+        return f"{endpoint}|{project}|{repo}"
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r') as fr:
+                state = json.load(fr)
+        except (IOError, ValueError):
+            return {"version": STATE_VERSION, "entries": dict()}
+        if state.get("version") != STATE_VERSION:
+            return {"version": STATE_VERSION, "entries": dict()}
+        return state
+
+    def _dump(self, state) -> None:
+        # write to a temporary file first so a crash never leaves half a state file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".rp_state_")
+        with os.fdopen(fd, 'w') as fw:
+            json.dump(state, fw, indent=2)
+        os.replace(temp_path, self.path)
+
+    def get(self, endpoint, project, repo):
+        """
+        This method returns recorded entry or None.
+        """
+        with self._locked():
+            return self._load()["entries"].get(self._key(endpoint, project, repo))
+
+    def save(self, endpoint, project, repo, **entry) -> None:
+        """
+        This method records entry of a successful provisioning.
+        """
+        with self._locked():
+            state = self._load()
+            entry["updated"] = int(time.time())
+            state["entries"][self._key(endpoint, project, repo)] = entry
+            self._dump(state)
+
+    def invalidate(self, endpoint, project, repo) -> None:
+        """
+        This method forgets entry, e.g. when server no longer has its objects.
+        """
+        with self._locked():
+            state = self._load()
+            if state["entries"].pop(self._key(endpoint, project, repo), None) is not None:
+                self._dump(state)
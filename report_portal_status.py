@@ -0,0 +1,7 @@
+# http status codes handled by ReportPortal clients, next to OKAY_RESPONSE_CODE
+# and CREATED_RESPONSE_CODE of report_portal_const
+BAD_REQUEST_RESPONSE_CODE = 400
+NOT_FOUND_RESPONSE_CODE = 404
+TOO_MANY_REQUESTS_RESPONSE_CODE = 429
+SERVICE_UNAVAILABLE_RESPONSE_CODE = 503
+THROTTLE_RESPONSE_CODES = (TOO_MANY_REQUESTS_RESPONSE_CODE, SERVICE_UNAVAILABLE_RESPONSE_CODE)
@@ -0,0 +1,156 @@
+import contextvars
+import functools
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+from tools.reportportal.src.report_portal_const import *
+
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36})$")
+UNKNOWN_OPERATION = "unknown"
+
+# client operation issuing current requests; pool tasks need copy_context().run to see it
+CURRENT_OPERATION = contextvars.ContextVar("rp_operation", default=UNKNOWN_OPERATION)
+
+
+def traced_operation(func):
+    """
+    This method tags every ReportPortal call made inside func with its name.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = CURRENT_OPERATION.set(func.__name__)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            CURRENT_OPERATION.reset(token)
+    return wrapper
+
+
+def submit_in_context(executor, fn, *args):
+    """
+    This method submits fn to executor with a copy of caller context,
+    so requests sent from pool threads keep caller operation.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def endpoint_template(url, project) -> str:
+    """
+    This method turns request url into endpoint template, ids become {id}.
+    """
+    path = urlsplit(url).path.split(RP_END_POINT, 1)[-1].strip('/')
+    parts = path.split('/')
+    if parts and parts[0] == project:
+        parts = parts[1:]
+    return '/'.join("{id}" if ID_SEGMENT.match(part) else part for part in parts)
+
+
+def body_size(body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    return len(body)
+
+
+class RequestTracer(object):
+    """
+    Records one span per ReportPortal call: endpoint, latency, status,
+    bytes and retries, tagged with dashboard and the client operation that issued it
+    (CURRENT_OPERATION, set by methods decorated with traced_operation).
+    Enable for every client with HttpRequest.tracer = RequestTracer();
+    when tracer is None send_http_request skips all of this.
+    """
+
+    def __init__(self) -> None:
+        self.spans = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def record(self, dashboard, operation, method, endpoint, status, started,
+               duration, wire_time, bytes_sent, bytes_received, retries) -> None:
+        span = {
+            "dashboard": dashboard,
+            "operation": operation,
+            "method": method,
+            "endpoint": endpoint,
+            "status": status,
+            "start_ms": round((started - self._origin) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+            "wire_ms": round(wire_time * 1000, 3),
+            "bytes_sent": bytes_sent,
+            "bytes_received": bytes_received,
+            "retries": retries,
+            "thread": threading.get_ident(),
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> dict:
+        """
+        This method aggregates spans per dashboard and per method + endpoint.
+        """
+        dashboards = dict()
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            dashboard = dashboards.setdefault(span["dashboard"], {"calls": 0, "total_ms": 0.0, "endpoints": dict()})
+            key = f"{span['method']} {span['endpoint']}"
+            endpoint = dashboard["endpoints"].setdefault(key, {
+                "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes_sent": 0, "bytes_received": 0,
+                "retries": 0, "statuses": dict(), "operations": dict()})
+            dashboard["calls"] += 1
+            dashboard["total_ms"] += span["duration_ms"]
+            endpoint["calls"] += 1
+            endpoint["total_ms"] += span["duration_ms"]
+            endpoint["max_ms"] = max(endpoint["max_ms"], span["duration_ms"])
+            endpoint["bytes_sent"] += span["bytes_sent"]
+            endpoint["bytes_received"] += span["bytes_received"]
+            endpoint["retries"] += span["retries"]
+            status = str(span["status"])
+            endpoint["statuses"][status] = endpoint["statuses"].get(status, 0) + 1
+            endpoint["operations"][span["operation"]] = endpoint["operations"].get(span["operation"], 0) + 1
+        for dashboard in dashboards.values():
+            dashboard["total_ms"] = round(dashboard["total_ms"], 3)
+            for endpoint in dashboard["endpoints"].values():
+                endpoint["total_ms"] = round(endpoint["total_ms"], 3)
+                endpoint["mean_ms"] = round(endpoint["total_ms"] / endpoint["calls"], 3)
+        return dashboards
+
+    def export_json(self, path) -> None:
+        """
+        This method writes spans and per dashboard summary as json.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, 'w') as fw:
+            json.dump({"summary": self.summary(), "spans": spans}, fw, indent=2)
+
+    def export_chrome_trace(self, path) -> None:
+        """
+        This method writes spans in chrome trace event format (chrome://tracing, perfetto).
+        """
+        with self._lock:
+            spans = list(self.spans)
+        pids = dict()
+        events = []
+        for span in spans:
+            if span["dashboard"] not in pids:
+                # one trace process per dashboard, named after it
+                pids[span["dashboard"]] = len(pids) + 1
+                events.append({"name": "process_name", "ph": "M", "pid": pids[span["dashboard"]],
+                               "args": {"name": str(span["dashboard"])}})
+            events.append({
+                "name": f"{span['method']} {span['endpoint']}",
+                "cat": span["operation"],
+                "ph": "X",
+                "ts": span["start_ms"] * 1000,
+                "dur": span["duration_ms"] * 1000,
+                "pid": pids[span["dashboard"]],
+                "tid": span["thread"],
+                "args": {key: span[key] for key in ("operation", "status", "wire_ms", "bytes_sent", "bytes_received", "retries")},
+            })
+        with open(path, 'w') as fw:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fw)
@@ -0,0 +1,133 @@
+import json
+import threading
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_status import BAD_REQUEST_RESPONSE_CODE
+from tools.reportportal.src.report_portal_index import (
+    LATEST_LAUNCH_SORT, NAME_FILTER, PAGE_NUMBER_PARAM, PAGE_SIZE_PARAM,
+    PAGE_SORT_PARAM, MetadataIndex, NameIndexCache,
+)
+
+
+class FakeClock(object):
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, body=None) -> None:
+        self.status_code = status_code
+        self.content = json.dumps(body or {}).encode()
+
+
+class PagedServer(object):
+    """
+    Serves named objects in pages of page.size, newest first when sorted
+    by startTime DESC, and records every request it gets.
+    """
+
+    rp_project_name = "project"
+
+    def __init__(self, base_url, names, name_filter=True, ignore_name_filter=False) -> None:
+        self.base_url = base_url
+        self.items = [{"id": index, "name": name} for index, name in enumerate(names, start=1)]
+        self.name_filter = name_filter
+        self.ignore_name_filter = ignore_name_filter
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def send_http_request(self, method, **args):
+        params = dict(args["params"])
+        with self.lock:
+            self.requests.append(params)
+        items = list(self.items)
+        if NAME_FILTER in params:
+            if not self.name_filter:
+                return FakeResponse(BAD_REQUEST_RESPONSE_CODE)
+            if not self.ignore_name_filter:
+                items = [item for item in items if item["name"] == params[NAME_FILTER]]
+        if params.get(PAGE_SORT_PARAM) == LATEST_LAUNCH_SORT:
+            items.reverse()
+        size = params.get(PAGE_SIZE_PARAM, 20)
+        number = params.get(PAGE_NUMBER_PARAM, 1)
+        total_pages = max(1, -(-len(items) // size))
+        return FakeResponse(OKAY_RESPONSE_CODE, {"content": items[(number - 1) * size:number * size],
+                                                 "page": {"number": number, "totalPages": total_pages}})
+
+    def filtered_requests(self) -> int:
+        return sum(1 for params in self.requests if NAME_FILTER in params)
+
+
+def index_for(server) -> MetadataIndex:
+    return MetadataIndex(server, cache=NameIndexCache())
+
+
+def test_resolve_uses_name_filter_then_cache():
+    server = PagedServer("http://filter.local/", ["a", "b", "c"])
+    index = index_for(server)
+    assert index.dashboard_id("b") == 2
+    assert len(server.requests) == 1
+    assert index.dashboard_id("b") == 2
+    assert len(server.requests) == 1
+
+
+def test_rejected_name_filter_falls_back_to_scan_once_per_endpoint():
+    server = PagedServer("http://rejected.local/", [f"dashboard_{index}" for index in range(250)], name_filter=False)
+    index = index_for(server)
+    assert index.dashboard_id("dashboard_120") == 121
+    assert server.filtered_requests() == 1
+    # scan stopped on page two, page three was never needed
+    assert len(server.requests) == 3
+    index.cache.invalidate()
+    assert index.dashboard_id("dashboard_3") == 4
+    assert server.filtered_requests() == 1
+    assert len(server.requests) == 4
+
+
+def test_ignored_name_filter_falls_back_to_scan():
+    server = PagedServer("http://ignored.local/", ["a", "b", "c"], ignore_name_filter=True)
+    index = index_for(server)
+    assert index.filter_id("c") == 3
+    assert server.filtered_requests() == 1
+    index.cache.invalidate()
+    assert index.filter_id("a") == 1
+    assert server.filtered_requests() == 1
+
+
+def test_scan_stops_on_first_page():
+    server = PagedServer("http://first.local/", [f"dashboard_{index}" for index in range(250)], name_filter=False)
+    index = index_for(server)
+    assert index.scan(DASHBOARD_END_POINT, "dashboard_5") == 6
+    assert len(server.requests) == 1
+
+
+def test_scan_keeps_latest_of_duplicate_launch_names():
+    server = PagedServer("http://launches.local/", ["svc"] * 150 + ["other"] * 100 + ["svc"], name_filter=False)
+    index = index_for(server)
+    assert index.launch_id("svc") == 251
+    assert all(params.get(PAGE_SORT_PARAM) == LATEST_LAUNCH_SORT for params in server.requests)
+    assert index.launch_id("other") == 250
+
+
+def test_cache_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = NameIndexCache(ttl=10, clock=clock)
+    cache.put("key", 1)
+    clock.now += 10
+    assert cache.get("key") == 1
+    clock.now += 0.5
+    assert cache.get("key") is None
+
+
+def test_expired_entry_is_resolved_again():
+    clock = FakeClock()
+    server = PagedServer("http://ttl.local/", ["a"])
+    index = MetadataIndex(server, cache=NameIndexCache(ttl=10, clock=clock))
+    assert index.dashboard_id("a") == 1
+    clock.now += 11
+    assert index.dashboard_id("a") == 1
+    assert len(server.requests) == 2
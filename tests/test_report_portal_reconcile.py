@@ -0,0 +1,125 @@
+import copy
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_reconcile import DashboardReconciler, get_widget_payloads
+from tools.reportportal.src.report_portal_status import NOT_FOUND_RESPONSE_CODE
+
+
+class FakeReportPortal(object):
+
+    base_url = "http://rp.local" + RP_END_POINT
+    rp_project_name = "project"
+    rp_dashboard_name = "svc_dashboard"
+    launch_name = "svc"
+    filter_id = 7
+
+
+def fetched(payload) -> dict:
+    """
+    Returns widget the way ReportPortal answers GET widget/{id} for payload.
+    """
+    widget = copy.deepcopy(payload)
+    widget["id"] = 1
+    widget["appliedFilters"] = [{"id": filter_id} for filter_id in widget.pop("filterIds")]
+    widget.pop("filters", None)
+    # server adds options of its own
+    widget.setdefault("contentParameters", {}).setdefault("widgetOptions", {})["serverDefault"] = True
+    return widget
+
+
+def test_widget_matching_payload_is_current():
+    reconciler = DashboardReconciler(FakeReportPortal())
+    for widgetType in (OVERALL_STATISTIC_CHART, FLAKY_TEST_CASE):
+        widget = fetched(reconciler.widget_payload(widgetType, "svc_dashboard_1"))
+        assert reconciler.widget_is_current(widgetType, widget)
+
+
+def test_widget_with_changed_content_is_stale(monkeypatch):
+    template = get_widget_payloads()[OVERALL_STATISTIC_CHART]
+    monkeypatch.setitem(template, "widgetType", "overallStatistics")
+    monkeypatch.setitem(template, "contentParameters", {"contentFields": ["statistics$executions$total"],
+                                                        "itemsCount": 50, "widgetOptions": {}})
+    reconciler = DashboardReconciler(FakeReportPortal())
+    payload = reconciler.widget_payload(OVERALL_STATISTIC_CHART, "svc_dashboard_1")
+    assert reconciler.widget_is_current(OVERALL_STATISTIC_CHART, fetched(payload))
+
+    for field, value in (("widgetType", "launchStatistics"), ("appliedFilters", [{"id": 8}])):
+        widget = fetched(payload)
+        widget[field] = value
+        assert not reconciler.widget_is_current(OVERALL_STATISTIC_CHART, widget)
+    widget = fetched(payload)
+    widget["contentParameters"]["itemsCount"] = 10
+    assert not reconciler.widget_is_current(OVERALL_STATISTIC_CHART, widget)
+    widget = fetched(payload)
+    widget["contentParameters"]["contentFields"] = []
+    assert not reconciler.widget_is_current(OVERALL_STATISTIC_CHART, widget)
+
+
+def test_launch_widget_bound_to_other_launch_is_stale():
+    reconciler = DashboardReconciler(FakeReportPortal())
+    widget = fetched(reconciler.widget_payload(FLAKY_TEST_CASE, "svc_dashboard_1"))
+    widget["contentParameters"]["widgetOptions"]["launchNameFilter"] = "other"
+    assert not reconciler.widget_is_current(FLAKY_TEST_CASE, widget)
+
+
+def test_matches_ignores_server_keys_and_list_order():
+    desired = {"contentFields": ["a", "b"], "itemsCount": 50, "widgetOptions": {"zoom": False}}
+    current = {"contentFields": ["b", "a"], "itemsCount": 50, "widgetOptions": {"zoom": False, "extra": 1}}
+    assert DashboardReconciler.matches(desired, current)
+    current["itemsCount"] = 20
+    assert not DashboardReconciler.matches(desired, current)
+
+
+def test_only_generated_widget_names_are_managed():
+    reconciler = DashboardReconciler(FakeReportPortal())
+    assert reconciler.is_managed_widget("svc_dashboard_3")
+    assert reconciler.is_managed_widget("svc_dashboard_12")
+    assert not reconciler.is_managed_widget("svc_dashboard_notes")
+    assert not reconciler.is_managed_widget("svc_dashboard_3_copy")
+    assert not reconciler.is_managed_widget("svcXdashboard_3")
+
+
+class FakeIndex(object):
+
+    def __init__(self, dashboard_id) -> None:
+        self.ids = {DASHBOARD_END_POINT: dashboard_id}
+        self.forgotten = []
+
+    def dashboard_id(self, name):
+        return self.ids.get(DASHBOARD_END_POINT)
+
+    def forget(self, end_point, name) -> None:
+        self.forgotten.append((end_point, name))
+        self.ids.pop(end_point, None)
+
+
+class NotFoundResponse(object):
+    status_code = NOT_FOUND_RESPONSE_CODE
+    content = b'{"message": "not found"}'
+
+
+class DeletedDashboardPortal(FakeReportPortal):
+    """
+    Dashboard id is still cached while server already deleted the dashboard.
+    """
+
+    def __init__(self) -> None:
+        self.index = FakeIndex(11)
+        self.dashboard_snapshot = None
+        self.posted = 0
+
+    def send_http_request(self, method, **args):
+        return NotFoundResponse()
+
+    def post_dashboard(self) -> None:
+        self.posted += 1
+        self.dashboard_id = 12
+
+
+def test_deleted_dashboard_is_forgotten_and_created_again():
+    rp = DeletedDashboardPortal()
+    reconciler = DashboardReconciler(rp)
+    assert reconciler.reconcile_dashboard() == []
+    assert rp.index.forgotten == [(DASHBOARD_END_POINT, rp.rp_dashboard_name)]
+    assert rp.posted == 1
+    assert rp.dashboard_id == 12
+    assert reconciler.changes["created"] == [rp.rp_dashboard_name]
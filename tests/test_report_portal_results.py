@@ -0,0 +1,120 @@
+import threading
+from tools.reportportal.src.report_portal_results import PASSED, ResultUploader
+
+
+class FakeReporter(object):
+    """
+    Records calls in place of LaunchReporter, optionally failing or blocking.
+    """
+
+    def __init__(self, fail_start=False, fail_finish=False, release=None) -> None:
+        self.fail_start = fail_start
+        self.fail_finish = fail_finish
+        self.release = release
+        self.launch_id = None
+        self.items = []
+        self.logs = []
+        self.finished = False
+
+    def start_launch(self, name, description="") -> str:
+        if self.release is not None:
+            self.release.wait()
+        if self.fail_start:
+            raise Exception("connection refused")
+        self.launch_id = "launch"
+        return self.launch_id
+
+    def finish_launch(self) -> None:
+        if self.fail_finish:
+            raise Exception("connection reset")
+        self.finished = True
+
+    def report_item(self, name, status, start_time, end_time, description="") -> str:
+        self.items.append(name)
+        return f"item_{len(self.items)}"
+
+    def send_logs(self, entries) -> None:
+        self.logs.append(entries)
+
+
+def result(index) -> dict:
+    return {"name": f"Service/Method_{index}", "status": PASSED, "start_time": 0, "end_time": 0,
+            "latency_ms": 1.0, "request": {"index": index}, "response": {}}
+
+
+def test_start_does_not_wait_for_launch():
+    release = threading.Event()
+    reporter = FakeReporter(release=release)
+    uploader = ResultUploader(reporter, "launch", flush_interval=0.01).start()
+    # launch POST is still blocked, executor keeps recording
+    assert uploader.record(result(0))
+    release.set()
+    stats = uploader.close()
+    assert stats["uploaded"] == 1
+    assert reporter.finished
+
+
+def test_failed_launch_start_is_counted_not_raised():
+    reporter = FakeReporter(fail_start=True)
+    uploader = ResultUploader(reporter, "launch", flush_interval=0.01).start()
+    for index in range(3):
+        uploader.record(result(index))
+    stats = uploader.close()
+    assert stats["failed"] == 3
+    assert stats["uploaded"] == 0
+    assert reporter.items == []
+    assert not reporter.finished
+
+
+def test_failed_launch_finish_is_not_raised():
+    reporter = FakeReporter(fail_finish=True)
+    uploader = ResultUploader(reporter, "launch", flush_interval=0.01).start()
+    uploader.record(result(0))
+    assert uploader.close()["uploaded"] == 1
+
+
+class FlakyReporter(FakeReporter):
+    """
+    Refuses items of given result names and log batches of given numbers.
+    """
+
+    def __init__(self, failing_items=(), failing_log_batches=()) -> None:
+        super().__init__()
+        self.failing_items = set(failing_items)
+        self.failing_log_batches = set(failing_log_batches)
+        self.log_calls = 0
+
+    def report_item(self, name, status, start_time, end_time, description="") -> str:
+        if name in self.failing_items:
+            raise Exception("500 internal server error")
+        return super().report_item(name, status, start_time, end_time, description)
+
+    def send_logs(self, entries) -> None:
+        self.log_calls += 1
+        if self.log_calls in self.failing_log_batches:
+            raise Exception("500 internal server error")
+        super().send_logs(entries)
+
+
+def upload(reporter, results, batch_size=100) -> dict:
+    uploader = ResultUploader(reporter, "launch", batch_size=batch_size, flush_interval=0.01)
+    reporter.launch_id = "launch"
+    uploader._upload(results)
+    return uploader.stats()
+
+
+def test_failed_item_does_not_lose_rest_of_batch():
+    reporter = FlakyReporter(failing_items={"Service/Method_3"})
+    stats = upload(reporter, [result(index) for index in range(10)])
+    assert (stats["uploaded"], stats["failed"]) == (9, 1)
+    assert len(reporter.items) == 9
+    logged = {entry["itemUuid"] for batch in reporter.logs for entry in batch}
+    assert len(logged) == 9
+
+
+def test_failed_log_batch_counts_only_its_results():
+    reporter = FlakyReporter(failing_log_batches={1})
+    results = [dict(result(index), response=None) for index in range(10)]
+    # one log line per result, so five results per log batch
+    stats = upload(reporter, results, batch_size=5)
+    assert (stats["uploaded"], stats["failed"], stats["log_batches"]) == (5, 5, 1)
@@ -0,0 +1,183 @@
+import time
+import pytest
+from email.utils import formatdate
+from tools.reportportal.src.report_portal_scheduler import (
+    MIN_CUT_WINDOW_SECONDS, RECOVERY_INTERVAL_SECONDS, RECOVERY_RATE_STEP,
+    ReportPortalThrottled, RequestScheduler, TokenBucket, get_scheduler, parse_retry_after,
+)
+
+
+class FakeClock(object):
+    """
+    Monotonic clock that only moves when sleep is called.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, retry_after=None) -> None:
+        self.status_code = status_code
+        self.headers = {} if retry_after is None else {"Retry-After": str(retry_after)}
+
+
+def fake_send(*responses):
+    """
+    Returns send callable answering with given responses in order, the last one repeated.
+    """
+    answers = list(responses)
+
+    def send():
+        return answers.pop(0) if len(answers) > 1 else answers[0]
+    return send
+
+
+def scheduler(clock, rate=10.0, burst=10, max_concurrency=8, max_retries=5) -> RequestScheduler:
+    return RequestScheduler(rate, burst, max_concurrency, max_retries, clock=clock, sleep=clock.sleep)
+
+
+def test_bucket_allows_burst_then_waits_for_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10.0, burst=5, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+    assert bucket.acquire() == pytest.approx(0.1)
+    assert clock.now == pytest.approx(1000.1)
+
+
+def test_bucket_pause_holds_senders_and_accrues_nothing():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10.0, burst=5, clock=clock, sleep=clock.sleep)
+    bucket.pause(2.0)
+    assert bucket.paused()
+    # pause ends first, then one token has to accrue at the normal rate
+    assert bucket.acquire() == pytest.approx(2.1)
+    assert not bucket.paused()
+
+
+def test_retry_after_is_honoured():
+    clock = FakeClock()
+    rs = scheduler(clock)
+    response_ = rs.submit(fake_send(FakeResponse(429, retry_after=3), FakeResponse(200)))
+    assert response_.status_code == 200
+    assert clock.now >= 1003.0
+    assert rs.stats()["retries"] == 1
+    assert rs.stats()["throttled"] == 1
+
+
+def test_exponential_backoff_without_retry_after():
+    clock = FakeClock()
+    rs = scheduler(clock)
+    rs.submit(fake_send(FakeResponse(503), FakeResponse(503), FakeResponse(200)))
+    # jittered backoff of 0.5s then 1s, at least half of each
+    assert clock.now - 1000.0 >= 0.25 + 0.5
+    assert rs.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_retries():
+    clock = FakeClock()
+    rs = scheduler(clock, max_retries=2)
+    with pytest.raises(ReportPortalThrottled) as error:
+        rs.submit(fake_send(FakeResponse(429, retry_after=0)))
+    assert error.value.response.status_code == 429
+    assert rs.stats()["requests"] == 3
+
+
+def test_burst_of_throttles_cuts_once():
+    clock = FakeClock()
+    rs = scheduler(clock, rate=16.0, max_concurrency=8)
+    # answers to eight requests already in flight arrive together
+    for _ in range(8):
+        rs._on_throttle(FakeResponse(429, retry_after=2), 0)
+    stats = rs.stats()
+    assert stats["throttled"] == 8
+    assert stats["cuts"] == 1
+    assert stats["concurrency_limit"] == 4
+    assert stats["rate"] == 8.0
+
+
+def test_throttle_after_window_cuts_again():
+    clock = FakeClock()
+    rs = scheduler(clock, rate=16.0, max_concurrency=8)
+    rs._on_throttle(FakeResponse(429, retry_after=0), 0)
+    clock.sleep(MIN_CUT_WINDOW_SECONDS / 2)
+    rs._on_throttle(FakeResponse(429, retry_after=0), 0)
+    assert rs.stats()["cuts"] == 1
+    clock.sleep(MIN_CUT_WINDOW_SECONDS)
+    rs._on_throttle(FakeResponse(429, retry_after=0), 0)
+    stats = rs.stats()
+    assert stats["cuts"] == 2
+    assert stats["concurrency_limit"] == 2
+    assert stats["rate"] == 4.0
+
+
+def test_limits_recover_additively_over_time():
+    clock = FakeClock()
+    rs = scheduler(clock, rate=10.0, max_concurrency=8)
+    rs._on_throttle(FakeResponse(429, retry_after=0), 0)
+    assert (rs.concurrency_limit, rs.bucket.rate) == (4, 5.0)
+    # successes alone do not restore anything before the interval passes
+    for _ in range(50):
+        rs._recover()
+    assert (rs.concurrency_limit, rs.bucket.rate) == (4, 5.0)
+    clock.sleep(MIN_CUT_WINDOW_SECONDS + RECOVERY_INTERVAL_SECONDS)
+    rs._recover()
+    assert rs.concurrency_limit == 5
+    assert rs.bucket.rate == pytest.approx(5.0 + RECOVERY_RATE_STEP * 10.0)
+    clock.sleep(100 * RECOVERY_INTERVAL_SECONDS)
+    rs.submit(fake_send(FakeResponse(200)))
+    assert (rs.concurrency_limit, rs.bucket.rate) == (8, 10.0)
+
+
+def test_default_scheduler_is_uncapped_until_throttled():
+    clock = FakeClock()
+    rs = RequestScheduler(clock=clock, sleep=clock.sleep)
+    for _ in range(500):
+        rs.submit(fake_send(FakeResponse(200)))
+    assert clock.now == 1000.0
+    assert (rs.stats()["rate"], rs.stats()["concurrency_limit"]) == (None, None)
+
+
+def test_uncapped_cut_starts_from_observed_rate_and_recovers_to_uncapped():
+    clock = FakeClock()
+    rs = RequestScheduler(clock=clock, sleep=clock.sleep)
+    for _ in range(40):
+        rs.submit(fake_send(FakeResponse(200)))
+    rs._on_throttle(FakeResponse(429, retry_after=0), 0)
+    assert rs.bucket.rate == 20.0
+    assert rs.concurrency_limit == 1
+    clock.sleep(MIN_CUT_WINDOW_SECONDS + RECOVERY_INTERVAL_SECONDS)
+    rs._recover()
+    assert rs.bucket.rate == pytest.approx(20.0 + RECOVERY_RATE_STEP * 40.0)
+    clock.sleep(100 * RECOVERY_INTERVAL_SECONDS)
+    rs._recover()
+    assert (rs.bucket.rate, rs.concurrency_limit) == (None, None)
+
+
+def test_get_scheduler_reconfigures_existing_scheduler():
+    endpoint = "http://reconfigure.local/api/v1/"
+    rs = get_scheduler(endpoint)
+    assert rs.max_rate is None
+    assert get_scheduler(endpoint, rate=5.0, max_concurrency=2) is rs
+    assert (rs.bucket.rate, rs.concurrency_limit) == (5.0, 2)
+    assert get_scheduler(endpoint) is rs
+    assert rs.bucket.rate == 5.0
+    with pytest.raises(TypeError):
+        get_scheduler(endpoint, ratee=1.0)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("-1") == 0.0
+    assert 0.0 < parse_retry_after(formatdate(timeval=time.time() + 30, usegmt=True)) <= 30.0
@@ -0,0 +1,42 @@
+import json
+import os
+import threading
+from tools.reportportal.src.report_portal_state import ProvisioningState
+
+ENDPOINT = "http://rp.local"
+PROJECT = "project"
+
+
+def test_concurrent_saves_keep_every_entry(tmp_path):
+    path = str(tmp_path / "state.json")
+    start = threading.Barrier(40)
+
+    def save(index):
+        # separate instance per thread, as every ReportPortal builds its own
+        state = ProvisioningState(path)
+        start.wait()
+        state.save(ENDPOINT, PROJECT, f"repo_{index}", dashboard_id=index)
+
+    threads = [threading.Thread(target=save, args=(index,)) for index in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(path) as fr:
+        entries = json.load(fr)["entries"]
+    assert len(entries) == 40
+    state = ProvisioningState(path)
+    assert all(state.get(ENDPOINT, PROJECT, f"repo_{index}")["dashboard_id"] == index for index in range(40))
+
+
+def test_relative_and_absolute_path_share_lock(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert ProvisioningState("state.json")._lock is ProvisioningState(os.path.abspath("state.json"))._lock
+
+
+def test_invalidate_removes_entry(tmp_path):
+    state = ProvisioningState(str(tmp_path / "state.json"))
+    state.save(ENDPOINT, PROJECT, "repo", dashboard_id=1)
+    state.invalidate(ENDPOINT, PROJECT, "repo")
+    assert state.get(ENDPOINT, PROJECT, "repo") is None
@@ -0,0 +1,67 @@
+import json
+import threading
+from tools.reportportal.src.report_portal_const import *
+from tools.reportportal.src.report_portal_index import PAGE_NUMBER_PARAM, MetadataIndex, NameIndexCache
+from tools.reportportal.src.report_portal_trace import (
+    CURRENT_OPERATION, UNKNOWN_OPERATION, endpoint_template, traced_operation,
+)
+
+
+class FakeResponse(object):
+
+    def __init__(self, body) -> None:
+        self.status_code = OKAY_RESPONSE_CODE
+        self.content = json.dumps(body).encode()
+
+
+class PagedClient(object):
+    """
+    Serves three pages of dashboards and records operation and thread of every request.
+    """
+
+    base_url = "http://rp.local" + RP_END_POINT
+    rp_project_name = "project"
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def send_http_request(self, method, **args):
+        with self.lock:
+            self.calls.append((CURRENT_OPERATION.get(), threading.get_ident()))
+        number = args["params"][PAGE_NUMBER_PARAM]
+        return FakeResponse({"content": [{"id": number, "name": f"dashboard_{number}"}],
+                             "page": {"number": number, "totalPages": 3}})
+
+
+@traced_operation
+def find_dashboard(index, name):
+    return index.scan(DASHBOARD_END_POINT, name)
+
+
+def test_operation_reaches_pool_threads():
+    client = PagedClient()
+    index = MetadataIndex(client, cache=NameIndexCache())
+    assert find_dashboard(index, "missing") is None
+    assert len(client.calls) == 3
+    assert {operation for operation, _ in client.calls} == {"find_dashboard"}
+    assert len({thread for _, thread in client.calls}) > 1
+    assert CURRENT_OPERATION.get() == UNKNOWN_OPERATION
+
+
+def test_nested_operation_is_restored():
+
+    @traced_operation
+    def inner():
+        return CURRENT_OPERATION.get()
+
+    @traced_operation
+    def outer():
+        return inner(), CURRENT_OPERATION.get()
+
+    assert outer() == ("inner", "outer")
+
+
+def test_endpoint_template_hides_ids():
+    url = "http://rp.local" + RP_END_POINT + "project/dashboard/42/17"
+    assert endpoint_template(url, "project") == "dashboard/{id}/{id}"